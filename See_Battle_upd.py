@@ -1,7 +1,19 @@
+import json
+import os
+import random
+import sys
+from collections import deque
 from random import randint
 from random import choice as ch
 from time import sleep
 
+#  NumPy - необязательная зависимость: с ним HunterBot считает карту вероятностей операциями над массивами,
+#  без него - тем же подсчетом по битовым маскам.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 #  -----------------------------------------------------------------------------------------------
 #  GameException родительский класс для всех пользовательских исключений, где Exception это внутренний класс
@@ -27,20 +39,76 @@ class PointUsedException(GameException):
 #  Класс исключений когда не правильно размещаются корабли на поле боя.
 class WrongShipException(GameException):
     pass
+
+
+#  Класс исключений когда игрок пытается стрелять не в свой ход или после окончания игры.
+class WrongTurnException(GameException):
+    def __str__(self):
+        return "Адмирал, сейчас не ваш ход!"
+
+
+#  Класс исключений когда флот невозможно расставить на поле заданного размера.
+class FleetPlacementException(GameException):
+    def __str__(self):
+        return "Флот с такими кораблями невозможно расставить на поле этого размера!"
 #  -----------------------------------------------------------------------------------------------
 
 
 #  -----------------------------------------------------------------------------------------------
 #  Класс Точка с двумя параметрами х и у(которые передаются в конструкторе).
+#  Точка неизменяемая и хешируемая, поэтому ее можно хранить в множествах и использовать как ключ словаря.
+#  Для каждого размера поля точки создаются один раз (intern_board), и Point(x, y) возвращает уже готовый
+#  общий экземпляр вместо создания нового объекта.
 class Point:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
+    __slots__ = ("x", "y")
+    #  Таблица заранее созданных точек по ключу (x, y) и размеры полей, для которых таблица уже заполнена.
+    _interned = {}
+    _boards = set()
+
+    def __new__(cls, x, y):
+        point = cls._interned.get((x, y))
+        if point is None:
+            point = object.__new__(cls)
+            object.__setattr__(point, "x", x)
+            object.__setattr__(point, "y", y)
+        return point
+
+    #  Заполняем таблицу точками поля размера size с запасом в одну клетку вокруг (для точек окружности корабля).
+    @classmethod
+    def intern_board(cls, size):
+        if size in cls._boards:
+            return
+        for x in range(-1, size + 1):
+            for y in range(-1, size + 1):
+                if (x, y) not in cls._interned:
+                    point = object.__new__(cls)
+                    object.__setattr__(point, "x", x)
+                    object.__setattr__(point, "y", y)
+                    cls._interned[(x, y)] = point
+        cls._boards.add(size)
+
+    #  Запрещаем изменять точку после создания.
+    def __setattr__(self, name, value):
+        raise AttributeError("Точка не может быть изменена")
+
+    def __delattr__(self, name):
+        raise AttributeError("Точка не может быть изменена")
+
+    #  Нужен для копирования и передачи точки в другие процессы.
+    def __reduce__(self):
+        return Point, (self.x, self.y)
 
     #  Метод для сравнения двух точек.
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Point):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
     #  Метод который отвечает за отображения точек (что бы у нас не печаталось
     # <__main__.Point object at 0x0000015033DB9400> а печаталась точка пример (1, 1).
     def __repr__(self) -> str:
@@ -52,36 +120,69 @@ class Point:
 #  Класс корабля с параметрами в конструкторе (rotation - в какую сторону будет смотреть корма корабля(0 - вверх,
 #  1 - вниз, 2 - влево, 3- вправо)), length - длинна корабля, start_point - это нос корабля(туда передаются координаты
 #  точки например Point(1, 1)).
+#  Точки корабля вычисляются один раз при создании и пересчитываются только если изменить позицию, длину
+#  или направление корабля.
 class Ship:
     def __init__(self, start_pos, length, rotation):
-        self.start_pos = start_pos
-        self.length = length
-        self.rotation = rotation
+        self._start_pos = start_pos
+        self._length = length
+        self._rotation = rotation
         self.hit_points = length
+        self._points = self._build_points()
+
+    @property
+    def start_pos(self):
+        return self._start_pos
+
+    @start_pos.setter
+    def start_pos(self, value):
+        self._start_pos = value
+        self._points = self._build_points()
 
-    #  Метод создает список ship_points в котором будут точки корабля, используем декоратор property
-    #  потому что этот метод задает свойства корабля.
     @property
-    def points(self) -> list:
+    def length(self):
+        return self._length
+
+    @length.setter
+    def length(self, value):
+        self._length = value
+        self._points = self._build_points()
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        self._rotation = value
+        self._points = self._build_points()
+
+    #  Свойство возвращает заранее посчитанное множество точек корабля.
+    @property
+    def points(self) -> frozenset:
+        return self._points
+
+    #  Метод создает множество ship_points в котором будут точки корабля.
+    def _build_points(self) -> frozenset:
         ship_points = []
         # Тут мы проходимся в цикле по значениям от 0 до длинны корабля.
-        for i in range(self.length):
+        for i in range(self._length):
             #  Разделяем начальную точку на x и y, что бы была возможность продлевать корабль вертикально
             #  или горизонтально.
-            coordinate_x = self.start_pos.x
-            coordinate_y = self.start_pos.y
+            coordinate_x = self._start_pos.x
+            coordinate_y = self._start_pos.y
 
-            if self.rotation == 0:
+            if self._rotation == 0:
                 coordinate_x -= i
-            elif self.rotation == 1:
+            elif self._rotation == 1:
                 coordinate_x += i
-            elif self.rotation == 2:
+            elif self._rotation == 2:
                 coordinate_y -= i
-            elif self.rotation == 3:
+            elif self._rotation == 3:
                 coordinate_y += i
             ship_points.append(Point(coordinate_x, coordinate_y))
-        #  В конце возвращает объект корабля в виде списка со всеми его точками.
-        return ship_points
+        #  В конце возвращает объект корабля в виде множества со всеми его точками.
+        return frozenset(ship_points)
 
     #  Метод, который проверяет попадание по кораблю.
     def falling_into_ship(self, shot) -> bool:
@@ -92,70 +193,164 @@ class Ship:
 #  -----------------------------------------------------------------------------------------------
 #  Класс для создания игрового поля (hid_ships отвечает за то будут ли отображаться корабли на этом поле,
 #  size - это размер поля).
+#  Состояние поля хранится в виде битовых масок (целых чисел): каждой клетке (x, y) соответствует бит с номером
+#  x * size + y. Так проверки "занята ли клетка" и разметка окружности корабля выполняются парой битовых операций,
+#  а не поиском по списку. Сетка из символов собирается только при отображении поля.
 class BattleField:
     def __init__(self, hid_ships=False, size=6):
         self.size = size
         self.hid_ships = hid_ships
-        #  Генератор для создания игровой сетки.
-        self.field = [["O"] * size for _ in range(size)]
-        #  used_points - будет хранить в себе "занятые" точки.
-        self.used_points = []
-        #  ships - список всех кораблей.
+        #  Заранее создаем все точки поля этого размера.
+        Point.intern_board(size)
+        #  full_mask - все клетки поля, вспомогательные маски нужны что б при сдвигах не перескакивать через край строки.
+        self.full_mask = (1 << (size * size)) - 1
+        first_col = sum(1 << (x * size) for x in range(size))
+        self.not_first_col = self.full_mask & ~first_col
+        self.not_last_col = self.full_mask & ~(first_col << (size - 1))
+        #  ships_mask - клетки кораблей.
+        self.ships_mask = 0
+        #  used_mask - будет хранить в себе "занятые" точки.
+        self.used_mask = 0
+        #  shot_mask - клетки в которые стреляли, hit_mask - клетки с попаданием по кораблю.
+        self.shot_mask = 0
+        self.hit_mask = 0
+        #  halo_mask - закрашенные точки вокруг уничтоженных кораблей.
+        self.halo_mask = 0
+        #  sunk_mask - клетки уничтоженных кораблей.
+        self.sunk_mask = 0
+        #  ships - список всех кораблей, ship_masks - маски клеток каждого корабля в том же порядке.
         self.ships = []
-        # count - количество живых кораблей.
-        self.count = 7
+        self.ship_masks = []
+        #  ship_at - индекс "номер клетки -> корабль", по нему выстрел сразу находит подбитый корабль.
+        self.ship_at = {}
+        # count - количество живых кораблей, растет при добавлении каждого корабля.
+        self.count = 0
+        #  _rows - кэш отрисованных строк поля по ключу (номер строки, скрыты ли корабли).
+        self._rows = {}
+        #  undo_log - журнал выстрелов для undo(). None - журнал не ведется (см. start_undo).
+        self.undo_log = None
+
+    #  Символ клетки с номером cell. Если hidden = True, целые клетки кораблей показываются пустыми "O".
+    def cell_symbol(self, cell, hidden=False) -> str:
+        bit = 1 << cell
+        if bit & self.hit_mask:
+            return "X"
+        if bit & self.ships_mask:
+            return "O" if hidden else "■"
+        if bit & (self.shot_mask | self.halo_mask):
+            return "T"
+        return "O"
+
+    #  Игровая сетка из символов, которая собирается из масок при отображении поля.
+    @property
+    def field(self) -> list:
+        return [[self.cell_symbol(x * self.size + y) for y in range(self.size)] for x in range(self.size)]
+
+    #  Номера клеток, которые входят в маску. Маска разбирается через ее двоичную запись за один проход,
+    #  а не проверкой каждого бита сдвигом (сдвиг большого числа на поле 100x100 сам по себе не бесплатный).
+    @staticmethod
+    def mask_cells(mask) -> list:
+        return [cell for cell, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1"]
+
+    #  Множество "занятых" точек, восстановленное из маски.
+    @property
+    def used_points(self) -> frozenset:
+        return frozenset(Point(cell // self.size, cell % self.size) for cell in self.mask_cells(self.used_mask))
+
+    #  Заголовок поля с номерами столбцов. Ширина столбца зависит от размера поля.
+    def header(self) -> str:
+        width = len(str(self.size))
+        return " " * width + " | " + " | ".join(str(y + 1).center(width) for y in range(self.size)) + " |"
+
+    #  Строка поля номер x. Готовые строки хранятся в кэше и собираются заново только после того, как
+    #  в них что-то поменялось (см. _touch).
+    def render_row(self, x, hidden=False) -> str:
+        key = (x, hidden)
+        row = self._rows.get(key)
+        if row is None:
+            width = len(str(self.size))
+            start = x * self.size
+            cells = " | ".join(self.cell_symbol(cell, hidden).center(width) for cell in range(start, start + self.size))
+            row = f"{str(x + 1).rjust(width)} | {cells} |"
+            self._rows[key] = row
+        return row
+
+    #  Все строки поля вместе с заголовком. Если hidden не передан, берется значение hid_ships.
+    def render_lines(self, hidden=None) -> list:
+        if hidden is None:
+            hidden = self.hid_ships
+        return [self.header()] + [self.render_row(x, hidden) for x in range(self.size)]
+
+    #  Убираем из кэша строки, в которых есть клетки из маски mask.
+    def _touch(self, mask):
+        row_mask = (1 << self.size) - 1
+        while mask:
+            x = ((mask & -mask).bit_length() - 1) // self.size
+            self._rows.pop((x, False), None)
+            self._rows.pop((x, True), None)
+            mask &= ~(row_mask << (x * self.size))
 
     #  Метод оформляет визуальное отображения поля в функции print.
+    #  Если hid_ships = True, клетки кораблей показываются пустыми "O".
     def __str__(self):
-        design = ""
-        design += "  | 1 | 2 | 3 | 4 | 5 | 6 |"
-        for i, j in enumerate(self.field):
-            design += f"\n{i + 1} | " + " | ".join(j) + " |"
-
-        #  Если hid_ships = True, все клетки кораблей "■" будут заменены на пустые "O".
-        if self.hid_ships:
-            design = design.replace("■", "O")
-        return design
+        return "\n".join(self.render_lines())
 
     #  Метод проверяющий находится ли точка за пределами игрового поля.
     #  Он нужен, что б мы могли отлавливать исключения.
     def out(self, point) -> bool:
         return not ((0 <= point.x < self.size) and (0 <= point.y < self.size))
 
+    #  Бит, который соответствует точке на поле (точка должна быть в пределах поля).
+    def bit(self, point) -> int:
+        return 1 << (point.x * self.size + point.y)
+
+    #  Метод возвращает маску клеток вокруг переданной маски (вместе с самими клетками).
+    def around_mask(self, mask) -> int:
+        #  Сначала расширяем маску на одну клетку влево и вправо в пределах строки,
+        wide = mask | ((mask << 1) & self.not_first_col) | ((mask >> 1) & self.not_last_col)
+        #  затем на одну строку вверх и вниз, отрезая все что вышло за поле.
+        return (wide | (wide << self.size) | (wide >> self.size)) & self.full_mask
+
     #  Метод для добавления корабля на поле боя.
     def add_ship(self, ship):
-        # В цикле проверяем: не выходит ли каждая точка корабля за границы и не занята ли точка другим кораблем или
+        # Проверяем: не выходит ли каждая точка корабля за границы и не занята ли точка другим кораблем или
         # точками окружности корабля.
+        mask = 0
         for point in ship.points:
-            if self.out(point) or point in self.used_points:
+            if self.out(point):
                 raise WrongShipException()
-        # Цикл для визуального отображения каждой точки корабля и заполнение занятых кораблем координат.
-        for point in ship.points:
-            self.field[point.x][point.y] = "■"
-            self.used_points.append(point)
+            mask |= self.bit(point)
+        if mask & self.used_mask:
+            raise WrongShipException()
+        # Отмечаем клетки корабля и заполняем занятые кораблем координаты.
+        self.ships_mask |= mask
+        self.used_mask |= mask
+        self._touch(mask)
 
-        # Добавляем корабль в список кораблей.
+        # Добавляем корабль в список кораблей и в индекс клеток.
         self.ships.append(ship)
+        self.ship_masks.append(mask)
+        self.count += 1
+        for point in ship.points:
+            self.ship_at[point.x * self.size + point.y] = ship
         # Создает точки окружности корабля.
         self.around_ship(ship)
 
     #  Метод around_ship будет добавлять все точки вокруг корабля в список занятых точек, это поможет нам правильно
     #  поставить корабли на игровое поле и для удобства буде закрашивать все точки вокруг корабля при его уничтожении.
     def around_ship(self, ship, hid_points=False):
-        #  Список всех возможных точек вокруг конкретной точки.
-        around_points = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
-        #  Цикл пробегается по всем точкам корабля.
+        mask = 0
         for point in ship.points:
-            #  Вложенный цикл пробегается по всем возможным точкам вокруг каждой точки корабля.
-            for dx, dy in around_points:
-                coordinate = Point(point.x + dx, point.y + dy)
-                #  Проверяем не выходит ли точка за границу поля и не является ли точка уже использованной.
-                if not (self.out(coordinate)) and coordinate not in self.used_points:
-                    #  Если корабль уничтожен все точки вокруг корабля закрашиваются знаком промаха "T".
-                    if hid_points:
-                        self.field[coordinate.x][coordinate.y] = "T"
-                    #  После всех проверок точки вокруг корабля добавляются в список "занятых" точек.
-                    self.used_points.append(coordinate)
+            if not self.out(point):
+                mask |= self.bit(point)
+        #  Берем только те точки вокруг корабля, которые еще не были использованы.
+        around = self.around_mask(mask) & ~self.used_mask
+        #  Если корабль уничтожен все точки вокруг корабля закрашиваются знаком промаха "T".
+        if hid_points:
+            self.halo_mask |= around
+            self._touch(around)
+        #  Точки вокруг корабля добавляются в "занятые" точки.
+        self.used_mask |= around
 
     #  Метод проверки выстрела на попадание/промах.
     def shot(self, point) -> bool:
@@ -163,43 +358,471 @@ class BattleField:
         if self.out(point):
             #  Исключение будет работать только для реального игрока, бот мимо поля стрелять не сможет.
             raise PointOutFieldException()
+        bit = self.bit(point)
         #  Проверяем что б координаты выстрела были в "свободной" точке.
-        if point in self.used_points:
+        if self.used_mask & bit:
             #  Исключение будет работать только для реального игрока, бот не сможет стрелять в "занятые" точки.
             raise PointUsedException()
-        #  Когда проходит все проверки - добавляем точку в список "использованных" точек.
-        self.used_points.append(point)
-        #  Проходимся по списку кораблей и проверяем является ли точка выстрела точкой корабля.
-        for ship in self.ships:
-            if ship.falling_into_ship(point):
-                #  Если да - уменьшаем количество жизней корабля.
-                ship.hit_points -= 1
-                #  Ставим "Х" в точке попадания.
-                self.field[point.x][point.y] = "X"
-                #  Если у корабля не осталось жизней - уменьшаем количество живых кораблей на 1 и отображаем точки
-                #  вокруг корабля меняя hid_points на True.
-                if ship.hit_points == 0:
-                    self.count -= 1
-                    self.around_ship(ship, hid_points=True)
-                    print("Корабль уничтожен!")
-                    #  возвращаем True что бы получить дополнительный ход.
-                    return True
-                else:
-                    #  Если корабль ранен - получаем дополнительный ход.
-                    print("Корабль ранен!")
-                    return True
+        #  Если ведется журнал - запоминаем маски до выстрела. Числа неизменяемы, поэтому это просто ссылки.
+        if self.undo_log is not None:
+            self.undo_log.append((point, self.used_mask, self.shot_mask, self.hit_mask, self.halo_mask,
+                                  self.sunk_mask, self.count))
+        #  Когда проходит все проверки - добавляем точку в "использованные" точки.
+        self.used_mask |= bit
+        self.shot_mask |= bit
+        self._touch(bit)
+        #  Ищем корабль в точке выстрела по индексу клеток.
+        ship = self.ship_at.get(point.x * self.size + point.y)
+        if ship is not None:
+            #  Ставим "Х" в точке попадания и уменьшаем количество жизней корабля.
+            self.hit_mask |= bit
+            ship.hit_points -= 1
+            #  Если у корабля не осталось жизней - уменьшаем количество живых кораблей на 1 и отображаем точки
+            #  вокруг корабля меняя hid_points на True.
+            if ship.hit_points == 0:
+                self.count -= 1
+                for ship_point in ship.points:
+                    self.sunk_mask |= self.bit(ship_point)
+                self.around_ship(ship, hid_points=True)
+                #  возвращаем True что бы получить дополнительный ход.
+                return True
+            else:
+                #  Если корабль ранен - получаем дополнительный ход.
+                return True
         #  Если корабля там нет указываем промах и ход переходит к противнику.
-        self.field[point.x][point.y] = "T"
-        print("Промах!")
         return False
 
     #  Метод нужен, что б в начале игры очистить список занятых точек.
     def preparation(self):
-        self.used_points = []
+        self.used_mask = 0
+
+    #  Снимок состояния поля для пробных ходов. Все маски - неизменяемые числа, поэтому снимок не копирует
+    #  клетки: это кортеж ссылок на маски, счетчики и жизни кораблей, его размер зависит только от числа кораблей.
+    #  Вместе с ними запоминается длина журнала undo и его последняя запись, что бы restore мог обрезать журнал.
+    def snapshot(self) -> tuple:
+        log = self.undo_log
+        return (self.ships_mask, self.used_mask, self.shot_mask, self.hit_mask, self.halo_mask, self.sunk_mask,
+                self.count, len(self.ships), tuple(ship.hit_points for ship in self.ships),
+                len(log) if log is not None else 0, log[-1] if log else None)
+
+    #  Возвращаем поле к снимку snapshot. Корабли, добавленные после снимка, убираются с поля,
+    #  из кэша отрисовки убираются только строки, в которых что-то поменялось.
+    def restore(self, snapshot):
+        (ships_mask, used_mask, shot_mask, hit_mask, halo_mask, sunk_mask, count, ships, hit_points,
+         logged, last_entry) = snapshot
+        #  Записи журнала после снимка больше не относятся к полю. Если журнал уже не совпадает с тем, что был
+        #  при снимке (выстрелы отменялись и делались заново), восстановить его нельзя - он очищается.
+        log = self.undo_log
+        if log is not None:
+            if logged <= len(log) and (not logged or log[logged - 1] is last_entry):
+                del log[logged:]
+            else:
+                log.clear()
+        changed = ((self.ships_mask ^ ships_mask) | (self.used_mask ^ used_mask) | (self.shot_mask ^ shot_mask)
+                   | (self.hit_mask ^ hit_mask) | (self.halo_mask ^ halo_mask))
+        for mask in self.ship_masks[ships:]:
+            for cell in self.mask_cells(mask):
+                del self.ship_at[cell]
+        del self.ships[ships:]
+        del self.ship_masks[ships:]
+        for ship, value in zip(self.ships, hit_points):
+            ship.hit_points = value
+        self.ships_mask = ships_mask
+        self.used_mask = used_mask
+        self.shot_mask = shot_mask
+        self.hit_mask = hit_mask
+        self.halo_mask = halo_mask
+        self.sunk_mask = sunk_mask
+        self.count = count
+        self._touch(changed)
+
+    #  Начинаем вести журнал выстрелов, по которому их можно отменять через undo().
+    def start_undo(self):
+        self.undo_log = []
 
-    #  Проверяем условие для победи одного из игроков
+    #  Отменяем последний выстрел из журнала и возвращаем его точку.
+    def undo(self):
+        if not self.undo_log:
+            raise GameException("Нет выстрелов для отмены")
+        point, used_mask, shot_mask, hit_mask, halo_mask, sunk_mask, count = self.undo_log.pop()
+        changed = (self.used_mask ^ used_mask) | (self.halo_mask ^ halo_mask)
+        if hit_mask != self.hit_mask:
+            self.ship_at[point.x * self.size + point.y].hit_points += 1
+        self.used_mask = used_mask
+        self.shot_mask = shot_mask
+        self.hit_mask = hit_mask
+        self.halo_mask = halo_mask
+        self.sunk_mask = sunk_mask
+        self.count = count
+        self._touch(changed)
+        return point
+
+    #  Проверяем условие для победи одного из игроков: на поле есть корабли и все они потоплены.
     def victory(self):
-        return self.count == 0
+        return bool(self.ships) and self.count == 0
+#  -----------------------------------------------------------------------------------------------
+
+
+#  Функция ставит два поля рядом (каждое со своим заголовком) и возвращает готовый текст,
+#  который можно вывести одной записью.
+def side_by_side(left, right, left_title="", right_title="", gap=4) -> str:
+    left_lines = [left_title] + left.render_lines()
+    right_lines = [right_title] + right.render_lines()
+    width = max(len(line) for line in left_lines) + gap
+    #  Если поля разного размера - дополняем более короткое пустыми строками.
+    while len(left_lines) < len(right_lines):
+        left_lines.append("")
+    while len(right_lines) < len(left_lines):
+        right_lines.append("")
+    return "\n".join(line_left.ljust(width) + line_right for line_left, line_right in zip(left_lines, right_lines))
+#  -----------------------------------------------------------------------------------------------
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Генератор случайной расстановки флота. Для поля размера size заранее вычисляются все допустимые позиции
+#  кораблей каждой длины (маска клеток корабля и маска клеток вместе с окружностью). Корабль ставится в позицию,
+#  выбранную равновероятно среди тех, что еще совместимы с уже поставленными кораблями. Если для следующего
+#  корабля позиций не осталось - делаем шаг назад и пробуем для предыдущего корабля другую позицию. Перебор
+#  конечен и ограничен MAX_NODES шагами, поэтому генератор всегда завершается: либо расстановкой, либо
+#  FleetPlacementException.
+class FleetPlacer:
+    #  Готовые генераторы по ключу (size, длины по убыванию), что бы не считать позиции для каждого поля заново.
+    #  Порядок словаря - порядок использования, в конце самые свежие.
+    _cache = {}
+    #  Сколько генераторов держать в _cache. На большом поле генератор занимает много памяти.
+    CACHE_SIZE = 8
+    #  Сколько случайных попыток делать, прежде чем фильтровать все позиции корабля.
+    SAMPLE_TRIES = 8
+    #  Сколько шагов перебора можно сделать за один вызов place, прежде чем признать флот нерасставляемым.
+    MAX_NODES = 200000
+
+    def __init__(self, size, ship_lens):
+        self.size = size
+        #  Длинные корабли ставим первыми - для них меньше всего вариантов, так перебор короче.
+        self.ship_lens = tuple(sorted(ship_lens, reverse=True))
+        #  possible - None, пока не известно, можно ли вообще расставить такой флот на таком поле.
+        self.possible = None
+        #  backtracks - сколько раз за все время пришлось вернуться к предыдущему кораблю.
+        self.backtracks = 0
+        #  _cell_arrays - позиции всех длин массивами NumPy для cell_arrays, считаются при первом обращении.
+        self._cell_arrays = None
+        helper = BattleField(size=size)
+        #  placements - для каждой длины список позиций (маска корабля, маска с окружностью, x, y, направление,
+        #  номера клеток корабля).
+        self.placements = {}
+        for length in set(self.ship_lens):
+            #  Направления 1 (вниз) и 3 (вправо) уже покрывают все положения корабля, однопалубному хватает одного.
+            rotations = (1, 3) if length > 1 else (1,)
+            options = []
+            for rotation in rotations:
+                #  Шаг между клетками корабля: вниз - на строку, вправо - на одну клетку.
+                step = size if rotation == 1 else 1
+                last_x = size - length if rotation == 1 else size - 1
+                last_y = size - 1 if rotation == 1 else size - length
+                for x in range(last_x + 1):
+                    for y in range(last_y + 1):
+                        start = x * size + y
+                        cells = tuple(range(start, start + step * length, step))
+                        mask = 0
+                        for cell in cells:
+                            mask |= 1 << cell
+                        options.append((mask, helper.around_mask(mask), x, y, rotation, cells))
+            self.placements[length] = options
+
+    #  Возвращаем общий генератор для поля и флота, создавая его при первом обращении. Порядок длин не важен,
+    #  давно не использованные генераторы вытесняются.
+    @classmethod
+    def get(cls, size, ship_lens):
+        key = (size, tuple(sorted(ship_lens, reverse=True)))
+        placer = cls._cache.pop(key, None)
+        if placer is None:
+            placer = cls(size, ship_lens)
+        cls._cache[key] = placer
+        while len(cls._cache) > cls.CACHE_SIZE:
+            del cls._cache[next(iter(cls._cache))]
+        return placer
+
+    #  Все позиции всех длин массивами NumPy: (номера клеток, длины). Строка - позиция, позиции короче самого
+    #  длинного корабля дополнены номером size * size - несуществующей клеткой за краем поля.
+    def cell_arrays(self) -> tuple:
+        if self._cell_arrays is None:
+            width = max(self.ship_lens)
+            rows = []
+            lengths = []
+            for length, options in self.placements.items():
+                for option in options:
+                    rows.append(option[5] + (self.size * self.size,) * (width - length))
+                    lengths.append(length)
+            self._cell_arrays = np.array(rows, dtype=np.intp), np.array(lengths, dtype=np.intp)
+        return self._cell_arrays
+
+    #  Позиции корабля длины length, которые не пересекаются с занятыми клетками used.
+    def _compatible(self, length, used) -> list:
+        return [option for option in self.placements[length] if not option[0] & used]
+
+    #  Пробуем несколько раз взять случайную позицию из всех и оставить ее, если она совместима. Так выбор тоже
+    #  равновероятен среди совместимых позиций, но на большом поле с редким флотом не нужно фильтровать весь
+    #  список. Если не повезло - возвращаем None, и позиции отфильтруются полностью.
+    def _sample(self, length, used, rng):
+        placements = self.placements[length]
+        for _ in range(self.SAMPLE_TRIES):
+            option = placements[rng.randrange(len(placements))]
+            if not option[0] & used:
+                return option
+        return None
+
+    #  Быстрая проверка до перебора. Флот точно не помещается, если для какого-то корабля нет ни одной позиции
+    #  или не помещаются прямоугольники (длина + 1) x 2 вокруг кораблей: у каждого корабля вместе с соседними
+    #  клетками справа и снизу свой прямоугольник, и все они лежат в поле (size + 1)^2.
+    def fits_area(self) -> bool:
+        if not all(self.placements.values()):
+            return False
+        return sum((length + 1) * 2 for length in self.ship_lens) <= (self.size + 1) ** 2
+
+    #  Метод подбирает позиции для всех кораблей флота и возвращает список выбранных позиций.
+    #  rng - источник случайных чисел (модуль random или объект random.Random).
+    #  Одинаковые корабли взаимозаменяемы: если позиция не подошла i-му кораблю, то при тех же предыдущих
+    #  кораблях она не подойдет и следующим кораблям той же длины (иначе их можно поменять местами). Поэтому
+    #  такие позиции запрещаются для всей оставшейся группы, и перебор не проходит одну и ту же расстановку
+    #  в разном порядке одинаковых кораблей.
+    def place(self, rng=random) -> list:
+        if self.possible is None and not self.fits_area():
+            self.possible = False
+        if self.possible is False:
+            raise FleetPlacementException()
+        count = len(self.ship_lens)
+        chosen = []
+        #  used_stack[i] - занятые клетки перед постановкой i-го корабля, options[i] - его еще не испробованные
+        #  позиции (None - позиции еще не фильтровались, сначала пробуем случайный выбор), banned[i] - маски
+        #  запрещенных позиций, failed[i] - маски позиций, которые i-му кораблю уже не подошли.
+        used_stack = [0]
+        options = [None] if count else []
+        banned = [frozenset()] if count else []
+        failed = [frozenset()] if count else []
+        nodes = 0
+        while len(chosen) < count:
+            nodes += 1
+            if nodes > self.MAX_NODES:
+                raise FleetPlacementException()
+            length = self.ship_lens[len(chosen)]
+            candidates = options[-1]
+            if candidates is None:
+                option = self._sample(length, used_stack[-1], rng)
+                if option is not None and option[0] in banned[-1]:
+                    option = None
+                if option is None:
+                    candidates = options[-1] = [option for option in self._compatible(length, used_stack[-1])
+                                                if option[0] not in banned[-1]]
+            #  Позиций для корабля не осталось - возвращаемся к предыдущему кораблю.
+            if candidates is not None and not candidates:
+                options.pop()
+                used_stack.pop()
+                banned.pop()
+                failed.pop()
+                if not chosen:
+                    self.possible = False
+                    raise FleetPlacementException()
+                bad = chosen.pop()
+                self.backtracks += 1
+                failed[-1] = failed[-1] | {bad[0]}
+                #  Для предыдущего корабля убираем из вариантов позицию, которая привела в тупик.
+                if options[-1] is None:
+                    options[-1] = [option for option in self._compatible(self.ship_lens[len(chosen)], used_stack[-1])
+                                   if option[0] not in banned[-1] and option[0] not in failed[-1]]
+                continue
+            if candidates is not None:
+                #  Берем случайную позицию и сразу убираем ее из вариантов, что бы при возврате не пробовать ее снова.
+                index = rng.randrange(len(candidates))
+                option = candidates[index]
+                candidates[index] = candidates[-1]
+                candidates.pop()
+            chosen.append(option)
+            if len(chosen) < count:
+                used_stack.append(used_stack[-1] | option[1])
+                options.append(None)
+                #  Следующий корабль той же длины наследует запреты и неудачные позиции текущего.
+                if self.ship_lens[len(chosen)] == length:
+                    banned.append(banned[-1] | failed[-1] if failed[-1] else banned[-1])
+                else:
+                    banned.append(frozenset())
+                failed.append(frozenset())
+        self.possible = True
+        return chosen
+
+    #  Метод создает поле боя по списку позиций, который вернул place.
+    def build_field(self, chosen, **field_options):
+        field = BattleField(size=self.size, **field_options)
+        for length, (_, _, x, y, rotation, _) in zip(self.ship_lens, chosen):
+            field.add_ship(Ship(Point(x, y), length, rotation))
+        #  Очищаем список занятых точек.
+        field.preparation()
+        return field
+
+    #  Метод создает поле боя со случайно расставленным флотом.
+    def create_field(self, rng=random, **field_options):
+        return self.build_field(self.place(rng), **field_options)
+
+    #  Генератор, который по очереди выдает n полей со случайной расстановкой. При одинаковом seed
+    #  последовательность полей всегда одна и та же.
+    def generate_fleets(self, n, seed=None, **field_options):
+        rng = random.Random(seed)
+        for _ in range(n):
+            yield self.create_field(rng, **field_options)
+#  -----------------------------------------------------------------------------------------------
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Кэш данных, которые одинаковы во всех партиях с одной настройкой: "априорная" карта (как часто каждая клетка
+#  занята кораблем в случайной расстановке флота) и дебютная книга ботов (лучшие клетки для первых выстрелов,
+#  пока ни один корабль не потоплен). Ключ - размер поля, состав флота и вариант правил. В памяти хранится
+#  не больше capacity настроек, давно не использованные вытесняются. Если задан path, кэш при первом обращении
+#  читается из файла, а save() записывает его обратно, поэтому после первого запуска ботам не нужно ничего считать.
+class PriorCache:
+    #  Сколько случайных расстановок флота используется для априорной карты.
+    PRIOR_SAMPLES = 1000
+    #  До скольких выстрелов по полю ходы записываются в дебютную книгу.
+    OPENING_DEPTH = 3
+    #  Вариант правил по умолчанию: корабли не могут касаться друг друга.
+    VARIANT = "no-touch"
+
+    def __init__(self, capacity=16, path=None):
+        self.capacity = capacity
+        self.path = path
+        #  _entries - ключ настройки -> {"prior": список или None, "openings": {(промахи, попадания): клетки}}.
+        #  Порядок словаря - порядок использования, в конце самые свежие.
+        self._entries = {}
+        #  _disk - данные файла в том виде, как они записаны. None - файл еще не читался.
+        self._disk = None
+        #  enabled - если False, боты не берут ходы из кэша и считают все заново (нужно для замеров).
+        self.enabled = True
+
+    @staticmethod
+    def key(size, ship_lens, variant=None) -> str:
+        lengths = ",".join(str(length) for length in sorted(ship_lens, reverse=True))
+        return f"{size}|{lengths}|{variant or PriorCache.VARIANT}"
+
+    #  Читаем файл кэша один раз, при первом обращении к кэшу. Файл читается посреди партии, поэтому
+    #  нечитаемый или испорченный файл не должен ее ронять: в этом случае кэш просто начинается пустым.
+    def _load_disk(self):
+        self._disk = {}
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._disk = data
+
+    #  Данные настройки по ключу. Свежая запись переносится в конец, лишние записи из начала вытесняются.
+    def entry(self, key) -> dict:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            if self._disk is None:
+                self._load_disk()
+            entry = self._parse(self._disk.get(key))
+        self._entries[key] = entry
+        while len(self._entries) > self.capacity:
+            old_key = next(iter(self._entries))
+            self._store(old_key, self._entries.pop(old_key))
+        return entry
+
+    #  Запись настройки из данных файла. Если запись испорчена - считаем, что ее нет.
+    @staticmethod
+    def _parse(stored) -> dict:
+        entry = {"prior": None, "openings": {}}
+        if stored is None:
+            return entry
+        try:
+            prior = stored["prior"]
+            openings = {}
+            for state, cells in stored["openings"].items():
+                misses, hits = state.split(":")
+                openings[int(misses, 16), int(hits, 16)] = list(cells)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return entry
+        entry["prior"] = list(prior) if isinstance(prior, list) else None
+        entry["openings"] = openings
+        return entry
+
+    #  Переносим запись в данные для файла, что бы вытеснение из памяти не теряло посчитанное.
+    def _store(self, key, entry):
+        if not self.path:
+            return
+        if self._disk is None:
+            self._load_disk()
+        self._disk[key] = {
+            "prior": entry["prior"],
+            "openings": {f"{misses:x}:{hits:x}": cells for (misses, hits), cells in entry["openings"].items()},
+        }
+
+    #  Априорная карта: для каждой клетки - в скольких из PRIOR_SAMPLES расстановок она занята кораблем.
+    def prior(self, size, ship_lens, variant=None) -> list:
+        entry = self.entry(self.key(size, ship_lens, variant))
+        if entry["prior"] is None:
+            heat = [0] * (size * size)
+            placer = FleetPlacer.get(size, ship_lens)
+            #  Расстановки берутся с постоянным seed, что бы карта не зависела от того, кто ее посчитал первым.
+            rng = random.Random(0)
+            for _ in range(self.PRIOR_SAMPLES):
+                for option in placer.place(rng):
+                    for cell in option[5]:
+                        heat[cell] += 1
+            entry["prior"] = heat
+        return entry["prior"]
+
+    #  Клетки из дебютной книги для состояния (промахи, попадания) или None, если его там нет.
+    def opening(self, key, misses, hits):
+        return self.entry(key)["openings"].get((misses, hits))
+
+    def store_opening(self, key, misses, hits, cells):
+        self.entry(key)["openings"][misses, hits] = cells
+
+    #  Заранее считаем априорную карту и всю дебютную книгу бота bot_class (по умолчанию HunterBot) до глубины
+    #  OPENING_DEPTH: перебираем лучшие клетки каждого состояния и оба исхода выстрела в них (промах и попадание).
+    def warm(self, size, ship_lens, bot_class=None):
+        bot_class = bot_class or HunterBot
+        self.prior(size, ship_lens)
+        radar = FleetPlacer.get(size, ship_lens).create_field()
+        bot = bot_class(None, radar)
+        key = self.key(size, ship_lens, bot.VARIANT)
+        fleet = [ship.length for ship in radar.ships]
+        states = {(0, 0)}
+        for depth in range(self.OPENING_DEPTH + 1):
+            following = set()
+            for misses, hits in states:
+                #  Состояние радара подставляется напрямую: кораблей не потоплено, занятые клетки - только выстрелы.
+                radar.shot_mask = radar.used_mask = misses | hits
+                radar.hit_mask = hits
+                cells = self.opening(key, misses, hits)
+                if cells is None:
+                    cells = bot.best_cells(radar, fleet, misses, hits)
+                    self.store_opening(key, misses, hits, cells)
+                if depth < self.OPENING_DEPTH:
+                    for cell in cells:
+                        following.add((misses | (1 << cell), hits))
+                        if max(fleet) > 1:
+                            following.add((misses, hits | (1 << cell)))
+            states = following
+
+    #  Записываем кэш в файл через временный файл, что бы прерванная запись не испортила его.
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        if self._disk is None:
+            self._load_disk()
+        for key, entry in self._entries.items():
+            self._store(key, entry)
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self._disk, file)
+        os.replace(temporary, path)
+
+
+#  Общий кэш для всей программы. Файл можно задать через переменную окружения SEE_BATTLE_PRIORS.
+priors = PriorCache(path=os.environ.get("SEE_BATTLE_PRIORS"))
 #  -----------------------------------------------------------------------------------------------
 
 
@@ -242,21 +865,169 @@ class Player:
 
 
 #  Класс бота.
+#  Бот хранит пул еще не обстрелянных клеток радара (список номеров клеток и словарь "клетка -> позиция в списке").
+#  Перед каждым выстрелом из пула убираются только клетки, которые стали занятыми с прошлого хода, а удаление
+#  делается обменом с последним элементом, поэтому выбор случайной клетки не зависит от размера поля.
 class Bot(Player):
+    def __init__(self, field, radar):
+        super().__init__(field, radar)
+        self._pool = []
+        self._pool_index = {}
+        self._pool_radar = None
+        self._seen_mask = 0
+
+    #  Заполняем пул заново по текущему состоянию радара.
+    def _fill_pool(self):
+        radar = self.radar
+        used = radar.used_mask
+        self._pool = radar.mask_cells(radar.full_mask & ~used)
+        self._pool_index = {cell: pos for pos, cell in enumerate(self._pool)}
+        self._pool_radar = radar
+        self._seen_mask = used
+
+    #  Удаляем клетку из пула, ставя на ее место последний элемент списка.
+    def _remove_from_pool(self, cell):
+        pos = self._pool_index.pop(cell, None)
+        if pos is None:
+            return
+        last = self._pool.pop()
+        if last != cell:
+            self._pool[pos] = last
+            self._pool_index[last] = pos
+
+    #  Приводим пул в соответствие с радаром, убирая клетки, занятые после прошлого хода.
+    def _sync_pool(self):
+        used = self.radar.used_mask
+        #  Если радар поменялся или какие-то клетки снова стали свободными - пул собирается заново.
+        if self._pool_radar is not self.radar or self._seen_mask & ~used:
+            self._fill_pool()
+            return
+        new = used & ~self._seen_mask
+        self._seen_mask = used
+        while new:
+            low = new & -new
+            self._remove_from_pool(low.bit_length() - 1)
+            new ^= low
+
+    #  Метод выбирает номер клетки для выстрела: случайную клетку из пула свободных.
+    def choose_cell(self) -> int:
+        self._sync_pool()
+        return ch(self._pool)
+
     #  В этом методе бот передает координаты своего выстрела.
     def request(self):
-        #  Генерируем список со всеми возможными точками.
-        points_list = [Point(i, j) for i in range(self.field.size) for j in range(self.field.size)]
-        #  Перебираем список использованных точек и удаляем их из общего списка.
-        for i in self.radar.used_points:
-            if i in points_list:
-                points_list.remove(i)
-        #  Из общего списка случайно выбирается один элемент.
-        shot_point = ch(points_list)
-        print(f"Враг выстрелил в точку: {shot_point.x + 1}, {shot_point.y + 1}")
+        cell = self.choose_cell()
+        shot_point = Point(cell // self.radar.size, cell % self.radar.size)
         return shot_point
 
 
+#  Бот-охотник. Перед каждым выстрелом строит "карту вероятностей": для каждой оставшейся на поле длины корабля
+#  перебирает все позиции, которые не задевают известные пустые клетки (промахи, окружность и клетки потопленных
+#  кораблей), и считает сколько позиций проходит через каждую свободную клетку. Выстрел делается в клетку с
+#  наибольшим значением. Если есть раненый, но еще не потопленный корабль (режим "добивания"), учитываются только
+#  позиции, проходящие через попадания, и они получают вес по числу накрытых попаданий.
+class HunterBot(Bot):
+    #  Во сколько раз позиция, накрывающая попадание, важнее обычной позиции.
+    TARGET_WEIGHT = 100
+
+    #  Вариант правил для ключа в кэше priors.
+    VARIANT = PriorCache.VARIANT
+
+    #  Считать карту через NumPy, если он установлен. На маленьких полях подсчет по маскам быстрее: вызовы NumPy
+    #  стоят дороже самой работы, поэтому массивы используются с поля NUMPY_MIN_SIZE x NUMPY_MIN_SIZE.
+    USE_NUMPY = np is not None
+    NUMPY_MIN_SIZE = 7
+
+    def choose_cell(self) -> int:
+        radar = self.radar
+        fleet = [ship.length for ship in radar.ships]
+        #  Клетки, где кораблей точно нет.
+        blocked = (radar.shot_mask & ~radar.hit_mask) | radar.halo_mask | radar.sunk_mask
+        #  Попадания по еще живым кораблям.
+        wounded = radar.hit_mask & ~radar.sunk_mask
+        #  Пока ни один корабль не потоплен и выстрелов мало, лучшие клетки одинаковы во всех партиях
+        #  и берутся из дебютной книги.
+        opening = (priors.enabled and not radar.sunk_mask
+                   and bin(radar.shot_mask).count("1") <= priors.OPENING_DEPTH)
+        if opening:
+            key = priors.key(radar.size, fleet, self.VARIANT)
+            best_cells = priors.opening(key, blocked, wounded)
+            if best_cells is None:
+                best_cells = self.best_cells(radar, fleet, blocked, wounded)
+                priors.store_opening(key, blocked, wounded, best_cells)
+        else:
+            best_cells = self.best_cells(radar, fleet, blocked, wounded)
+        if not best_cells:
+            return super().choose_cell()
+        return ch(best_cells)
+
+    #  Самые "горячие" свободные клетки радара.
+    def best_cells(self, radar, fleet, blocked, wounded) -> list:
+        placer = FleetPlacer.get(radar.size, fleet)
+        #  Сколько кораблей каждой длины еще не потоплено.
+        remaining = {}
+        for ship in radar.ships:
+            if ship.hit_points > 0:
+                remaining[ship.length] = remaining.get(ship.length, 0) + 1
+        if self.USE_NUMPY and radar.size >= self.NUMPY_MIN_SIZE:
+            return self._best_cells_numpy(radar, placer, remaining, blocked, wounded)
+
+        heat = [0] * (radar.size * radar.size)
+        for length, ships_left in remaining.items():
+            for mask, _, _, _, _, cells in placer.placements[length]:
+                if mask & blocked:
+                    continue
+                if wounded:
+                    covered = mask & wounded
+                    if not covered:
+                        continue
+                    weight = ships_left * self.TARGET_WEIGHT * bin(covered).count("1")
+                else:
+                    weight = ships_left
+                for cell in cells:
+                    heat[cell] += weight
+
+        #  Выбираем самые "горячие" свободные клетки, одинаковые значения потом разыгрываются случайно.
+        best = 0
+        best_cells = []
+        for cell in radar.mask_cells(radar.full_mask & ~radar.used_mask):
+            value = heat[cell]
+            if value < best or not value:
+                continue
+            if value > best:
+                best = value
+                best_cells = [cell]
+            else:
+                best_cells.append(cell)
+        return best_cells
+
+    #  То же, что best_cells, но все позиции проверяются и складываются в карту сразу, операциями над массивами.
+    def _best_cells_numpy(self, radar, placer, remaining, blocked, wounded) -> list:
+        count = radar.size * radar.size
+        cells, lengths = placer.cell_arrays()
+        #  Отметки масок на одну клетку длиннее поля: клетка за краем, которой дополнены короткие позиции, пустая.
+        blocked_cells = _mask_array(blocked, count + 1)
+        ships_left = np.zeros(cells.shape[1] + 1)
+        for length, left in remaining.items():
+            ships_left[length] = left
+        #  Позиция подходит, если ни одна ее клетка не попала в blocked.
+        weight = ships_left[lengths] * ~blocked_cells[cells].any(axis=1)
+        if wounded:
+            weight *= self.TARGET_WEIGHT * _mask_array(wounded, count + 1)[cells].sum(axis=1)
+        heat = np.bincount(cells.ravel(), weights=np.repeat(weight, cells.shape[1]), minlength=count + 1)[:count]
+        heat[_mask_array(radar.used_mask, count)] = 0
+        best = heat.max()
+        if not best:
+            return []
+        return np.flatnonzero(heat == best).tolist()
+
+
+#  Маска клеток как массив NumPy из count отметок (True - клетка есть в маске).
+def _mask_array(mask, count):
+    data = np.frombuffer(mask.to_bytes((count + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little", count=count).view(bool)
+
+
 #  Класс пользователя
 class User(Player):
     #  Просим игрока ввести координаты
@@ -305,52 +1076,157 @@ class User(Player):
 #  -----------------------------------------------------------------------------------------------
 
 
+#  -----------------------------------------------------------------------------------------------
+#  События игры. Game.apply_shot не печатает результат выстрела, а складывает события в очередь, которую
+#  можно прочитать через Game.events(): консоль печатает по ним сообщения, а симуляции и сервер могут
+#  использовать их как угодно (например, сохранять для аналитики).
+class GameEvent:
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+#  Игрок player выстрелил в точку point.
+class ShotFired(GameEvent):
+    def __init__(self, player, point):
+        self.player = player
+        self.point = point
+
+
+#  Выстрел игрока player в точку point ранил корабль ship.
+class Hit(GameEvent):
+    def __init__(self, player, point, ship):
+        self.player = player
+        self.point = point
+        self.ship = ship
+
+
+#  Выстрел игрока player в точку point потопил корабль ship.
+class Sunk(GameEvent):
+    def __init__(self, player, point, ship):
+        self.player = player
+        self.point = point
+        self.ship = ship
+
+
+#  Игрок player промахнулся, выстрелив в точку point.
+class Miss(GameEvent):
+    def __init__(self, player, point):
+        self.player = player
+        self.point = point
+
+
+#  Ход перешел к игроку player.
+class TurnChanged(GameEvent):
+    def __init__(self, player):
+        self.player = player
+
+
+#  Игра окончена, победил игрок winner.
+class GameOver(GameEvent):
+    def __init__(self, winner):
+        self.winner = winner
+
+
+#  Результат одного выстрела: точка, подбитый корабль (или None), потоплен ли он, остается ли ход за
+#  стрелявшим, закончилась ли игра и список событий этого выстрела.
+class ShotResult:
+    def __init__(self, point, ship, sunk, extra_turn, game_over, events):
+        self.point = point
+        self.ship = ship
+        self.sunk = sunk
+        self.extra_turn = extra_turn
+        self.game_over = game_over
+        self.events = events
+
+    #  Результат можно проверять как bool, так же как результат BattleField.shot: True - попадание.
+    def __bool__(self) -> bool:
+        return self.ship is not None
+
+    def __repr__(self) -> str:
+        return f"ShotResult(point={self.point!r}, sunk={self.sunk}, extra_turn={self.extra_turn}, " \
+               f"game_over={self.game_over})"
+#  -----------------------------------------------------------------------------------------------
+
+
 #  -----------------------------------------------------------------------------------------------
 #  Класс Игра, где из всех созданных ранее классов, мы будем создавать объекты и настраивать логику взаимодействия.
 class Game:
-    def __init__(self, size=6):
+    #  Готовые настройки: имя -> (размер поля, длины кораблей).
+    PRESETS = {
+        "default": (6, [3, 2, 2, 1, 1, 1, 1]),
+        "classic": (10, [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]),
+        "stress": (100, [5] * 5 + [4] * 10 + [3] * 15 + [2] * 20 + [1] * 25),
+    }
+
+    #  Названия кораблей по количеству палуб для приветствия.
+    SHIP_NAMES = {
+        1: "Катер (Однопалубный корабль)",
+        2: "Эсминец (двух палубный корабль)",
+        3: "Крейсер (трех палубный корабль)",
+        4: "Линкор (четырех палубный корабль)",
+    }
+
+    def __init__(self, size=6, ship_lens=None):
         self.size = size
         #  Список с длиной кораблей для расстановки на поле боя.
-        self.ship_lens = [3, 2, 2, 1, 1, 1, 1]
+        self.ship_lens = list(ship_lens) if ship_lens is not None else [3, 2, 2, 1, 1, 1, 1]
         # Создавать игровые поля будем в процессе игры
         self.bot_field = None
         self.user_field = None
         self.user = User(self.user_field, self.bot_field)
         self.bot = Bot(self.bot_field, self.user_field)
+        #  current - игрок, который сейчас ходит, winner - победитель (None пока игра идет).
+        self.current = None
+        self.winner = None
+        #  Очередь событий, которые еще не были прочитаны через events().
+        self._events = deque()
 
-    #  Метод "Приветствие" с игроком
-    @staticmethod
-    def greetings() -> None:
-        print('-' * 80)
-        sleep(1)
-        print('Приветствую вас в игре "Морской бой"')
-        print('-' * 80)
-        sleep(1)
-        print('''    Вы получили внеочередное звание Адмирала!
+    #  Создаем игру по имени готовой настройки из PRESETS.
+    @classmethod
+    def from_preset(cls, name):
+        size, ship_lens = cls.PRESETS[name]
+        return cls(size, ship_lens)
+
+    #  Тексты приветствия по порядку, между ними делается пауза. Описание флота собирается из ship_lens.
+    def greetings_texts(self) -> list:
+        fleet = []
+        for length in sorted(set(self.ship_lens), reverse=True):
+            name = self.SHIP_NAMES.get(length, f"Корабль ({length} палуб)")
+            fleet.append(f"- {name} х {self.ship_lens.count(length)}")
+        return [
+            'Приветствую вас в игре "Морской бой"',
+            '''    Вы получили внеочередное звание Адмирала!
 Также, вы получаете под личное командование собственный флот:
-- Крейсер (трех палубный корабль) х 1;
-- Эсминец (двух палубный корабль) х 2;
-- Катер (Однопалубный корабль) х 4.''')
-        print('-' * 80)
-        sleep(1)
-        print('''    Сейчас вы отправляетесь на очередное боевое задание.
+''' + ";\n".join(fleet) + ".",
+        ] + self.GREETINGS
+
+    #  Тексты приветствия, которые не зависят от флота.
+    GREETINGS = [
+        '''    Сейчас вы отправляетесь на очередное боевое задание.
 Вам предстоит встретится с противником, у которого флот аналогичен вашему.
 Ваша задача: потопить весь вражеский флот, сохранив хотя бы один свой корабль.
-Все что вам нужно делать, это указывать координаты выстрела.''')
-        print('-' * 80)
-        sleep(1)
-        print('Формат ввода: x и y , где х - номер строки, а у - номер столбца.')
+Все что вам нужно делать, это указывать координаты выстрела.''',
+        'Формат ввода: x и y , где х - номер строки, а у - номер столбца.',
+    ]
+
+    #  Метод "Приветствие" с игроком
+    def greetings(self) -> None:
         print('-' * 80)
         sleep(1)
+        for text in self.greetings_texts():
+            print(text)
+            print('-' * 80)
+            sleep(1)
 
-    #  Печатаем поле игрока и противника(радар).
+    #  Печатаем поле игрока и противника(радар) рядом друг с другом одной записью в консоль.
     def print_fields(self):
-        print('-' * 80)
-        print("Ваша карта:")
-        print(self.user.field)
-        print('-' * 80)
-        print("Ваш радар:")
-        print(self.bot.field)
+        text = side_by_side(self.user.field, self.bot.field, "Ваша карта:", "Ваш радар:")
+        sys.stdout.write('-' * 80 + '\n' + text + '\n')
+        sys.stdout.flush()
 
     #  Метод который гарантированно создает поле боя.
     def creating_field(self, choice=2):
@@ -375,7 +1251,7 @@ class Game:
                 print(field)
                 #  Если нет возможности поставить корабль на поле, даем игроку выбор: попытаться снова или
                 #  перейти на автоматический режим.
-                if len(field.used_points) == 36:
+                if field.used_mask == field.full_mask:
                     print('-' * 80)
                     print('''Адмирал, у вас не осталось свободных координат что бы разместить корабль.
 Прийдется все начать с начала.''')
@@ -410,30 +1286,9 @@ class Game:
         field.preparation()
         return field
 
-    #  Метод, который пытается случайно расставить корабли на поле боя.
+    #  Метод, который случайно расставляет корабли на поле боя.
     def random_creation(self):
-        #  Создаем поле
-        field = BattleField(size=self.size)
-        # Счетчик итераций цикла.
-        try_ = 0
-        #  Для каждой длинны корабля, в бесконечном цикле будем пытаться его поставить.
-        for ship_len in self.ship_lens:
-            while True:
-                try_ += 1
-                #  Если счетчик перевалил за 500 итераций - возвращаем None и начинаем генерировать поле заново.
-                if try_ > 500:
-                    return 2
-                ship = Ship(Point(randint(0, self.size), randint(0, self.size)), ship_len, randint(0, 1))
-                # Пробуем поставить корабли, если все получается - цикл завершается.
-                # Если получаем ошибку - переходим на новую итерацию цикла.
-                try:
-                    field.add_ship(ship)
-                    break
-                except WrongShipException:
-                    pass
-        #  Очищаем список занятых точек.
-        field.preparation()
-        return field
+        return FleetPlacer.get(self.size, self.ship_lens).create_field()
 
     #  Создаем поле боя для каждого игрока.
     def creating_players_fields(self):
@@ -445,42 +1300,103 @@ class Game:
         #  Скрываем отображение кораблей на доске противника.
         self.bot_field.hid_ships = True
 
+    #  Начинаем партию: first - кто ходит первым, по умолчанию выбирается случайно.
+    def begin(self, first=None):
+        if first is None:
+            first = self.user if randint(0, 1) == 0 else self.bot
+        self.current = first
+        self.winner = None
+        self._events.append(TurnChanged(first))
+
+    #  Соперник игрока player.
+    def opponent(self, player):
+        return self.bot if player is self.user else self.user
+
+    #  Один шаг игры: игрок player стреляет в точку point. Исключения поля (выстрел мимо поля, в занятую точку)
+    #  пробрасываются дальше, состояние игры при этом не меняется.
+    def apply_shot(self, player, point) -> ShotResult:
+        if self.winner is not None or player is not self.current:
+            raise WrongTurnException()
+        radar = player.radar
+        if radar.out(point):
+            raise PointOutFieldException()
+        ship = radar.ship_at.get(point.x * radar.size + point.y)
+        count = radar.count
+        hit = radar.shot(point)
+        sunk = hit and radar.count < count
+        events = [ShotFired(player, point)]
+        if not hit:
+            events.append(Miss(player, point))
+        elif sunk:
+            events.append(Sunk(player, point, ship))
+        else:
+            events.append(Hit(player, point, ship))
+        #  При попадании ход остается за стрелявшим, при промахе переходит к сопернику.
+        if radar.victory():
+            self.winner = player
+            events.append(GameOver(player))
+        elif not hit:
+            self.current = self.opponent(player)
+            events.append(TurnChanged(self.current))
+        self._events.extend(events)
+        return ShotResult(point, ship if hit else None, sunk, hit and self.winner is None,
+                          self.winner is not None, events)
+
+    #  Генератор событий, накопившихся с прошлого чтения.
+    def events(self):
+        while self._events:
+            yield self._events.popleft()
+
+    #  Просим игрока player сделать свой ход, пока выстрел не будет выполнен.
+    def make_move(self, player) -> ShotResult:
+        while True:
+            try:
+                return self.apply_shot(player, player.request())
+            except GameException as exc:
+                print(exc)
+
+    #  Текст, который консоль печатает для события (None - событие ничего не печатает).
+    def describe_event(self, event):
+        if isinstance(event, ShotFired) and event.player is self.bot:
+            return f"Враг выстрелил в точку: {event.point.x + 1}, {event.point.y + 1}"
+        if isinstance(event, Hit):
+            return "Корабль ранен!"
+        if isinstance(event, Sunk):
+            return "Корабль уничтожен!"
+        if isinstance(event, Miss):
+            return "Промах!"
+        if isinstance(event, GameOver):
+            if event.winner is self.user:
+                return """Поздравляем с победой, Адмирал!
+Вы доказали, что достойны управлять флотом!"""
+            return 'Ваш флот уничтожен! "Press F to pay respects((("'
+        return None
+
+    #  Консоль - один из потребителей событий: печатает сообщения, а в конце игры еще и поля.
+    def show_event(self, event):
+        if isinstance(event, GameOver):
+            self.print_fields()
+            print('-' * 80)
+        text = self.describe_event(event)
+        if text is not None:
+            print(text)
+
 #  Метод игровой логики
     def logic(self):
-        #  Счетчик для определения очередности хода игрока/бота. Случайно определяем кто будет ходить первым.
-        next_move = randint(0, 1)
-        while True:
+        #  Случайно определяем кто будет ходить первым.
+        self.begin()
+        while self.winner is None:
             self.print_fields()
-            #  Если номер хода четный - ходит игрок, нечетный - бот.
-            if next_move % 2 == 0:
-                print('-' * 80)
+            print('-' * 80)
+            if self.current is self.user:
                 print("Адмирал, ваш ход!")
-                #  result возвращает нам True или False, это значит либо дальше ходит противник, либо мы получаем
-                #  дополнительный ход.
-                result = self.user.make_move()
             else:
-                print('-' * 80)
                 print("Ход противника!")
                 sleep(1)
-                result = self.bot.make_move()
-            #  Если result вернул True - мы получаем дополнительный ход.
-            if result:
-                next_move -= 1
-            #  Если потоплены все корабли на доске Бота - игрок победил.
-            if self.bot.field.victory():
-                self.print_fields()
-                print('-' * 80)
-                print("""Поздравляем с победой, Адмирал!
-Вы доказали, что достойны управлять флотом!""")
-                break
-            #  Если потоплены все корабли на доске игрока - Бот победил.
-            if self.user.field.victory():
-                self.print_fields()
-                print('-' * 80)
-                print('Ваш флот уничтожен! "Press F to pay respects((("')
-                break
-            #  Увеличиваем значение хода на 1, что бы ходил соперник.
-            next_move += 1
+            self.make_move(self.current)
+            #  Печатаем все что произошло за ход.
+            for event in self.events():
+                self.show_event(event)
 
     #  Метод старт игры запускает приветствие, создаем поля игрокам запускаем логику игры.
     def start(self):
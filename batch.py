@@ -0,0 +1,356 @@
+import argparse
+import random
+from collections import Counter
+
+from See_Battle_upd import FleetPlacementException, FleetPlacer, Game, PointUsedException, PointOutFieldException
+
+#  NumPy - необязательная зависимость, она нужна только пакетному движку: pip install numpy.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Пакетный движок: много полей одного размера хранятся в общих массивах NumPy (номер корабля в каждой клетке,
+#  отметка занятой клетки, жизни каждого корабля), и за один шаг по каждому полю делается один выстрел - одной
+#  операцией над всеми массивами сразу, без цикла Python по полям. Правила те же, что в BattleField.shot:
+#  выстрел в занятую клетку - ошибка, при потоплении корабля его окружность помечается занятой (как
+#  around_ship(hid_points=True)), при попадании стреляющий ходит еще раз.
+#  -----------------------------------------------------------------------------------------------
+
+#  Результаты выстрела.
+MISS = 0
+HIT = 1
+SUNK = 2
+
+#  Сколько раз подряд пробовать случайную позицию корабля при расстановке, прежде чем выбирать среди всех
+#  подходящих позиций (как FleetPlacer.SAMPLE_TRIES).
+PLACE_TRIES = 16
+#  Сколько пар (поле, позиция) проверять за раз при выборе среди всех подходящих позиций.
+PICK_CHUNK = 1 << 22
+#  Сколько раз начинать расстановку заново, прежде чем доставить оставшиеся поля через FleetPlacer.
+PLACE_ROUNDS = 64
+#  Сколько следующих клеток порядка стрельбы проверять за раз при поиске свободной (см. random_targets).
+TARGET_WINDOW = 8
+#  По сколько полей за раз перемешивать порядок стрельбы, что бы не держать в памяти ключи сразу всех полей.
+ORDER_CHUNK = 1 << 16
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Для пакетного движка нужен NumPy: pip install numpy")
+
+
+#  Класс пачки полей. Поле номер b - строка b во всех массивах.
+class BatchBoards:
+    def __init__(self, n, size=6, ship_lens=None):
+        _require_numpy()
+        self.n = n
+        self.size = size
+        self.cells = size * size
+        #  Корабли нумеруются с 1 в том же порядке, в каком их ставит FleetPlacer (длинные первыми).
+        self.ship_lens = tuple(sorted(ship_lens or Game.PRESETS["default"][1], reverse=True))
+        self.ships = len(self.ship_lens)
+        #  ship_id - номер корабля в клетке (0 - пусто).
+        self.ship_id = np.zeros((n, self.cells), dtype=np.int8 if self.ships < 127 else np.int16)
+        #  Маски клеток хранятся словами по 64 бита: клетка cell - бит cell % 64 слова cell // 64.
+        self.words = (self.cells + 63) // 64
+        #  used - занятые клетки (в них стреляли или они в окружности потопленного корабля).
+        self.used = np.zeros((n, self.words), dtype=np.uint64)
+        #  halo[b, s] - клетки корабля s поля b вместе с окружностью, при потоплении они становятся занятыми.
+        self.halo = np.zeros((n, self.ships + 1, self.words), dtype=np.uint64)
+        #  hit_points[b, s] - жизни корабля s поля b, столбец 0 не используется.
+        self.hit_points = np.zeros((n, self.ships + 1), dtype=np.int16)
+        self.hit_points[:, 1:] = self.ship_lens
+        #  alive - количество живых кораблей на каждом поле.
+        self.alive = np.zeros(n, dtype=np.int16)
+        #  order и position - порядок случайной стрельбы по каждому полю и место в нем (см. random_targets).
+        self.order = None
+        self.position = None
+
+    #  Маски (числа Python, как в BattleField) в виде массива (маски, слова по 64 бита).
+    def _words(self, masks):
+        length = self.words * 8
+        raw = b"".join(mask.to_bytes(length, "little") for mask in masks)
+        return np.frombuffer(raw, dtype="<u8").astype(np.uint64).reshape(len(masks), self.words)
+
+    #  Маска занятых клеток поля board в виде числа Python, как BattleField.used_mask.
+    def used_mask(self, board) -> int:
+        mask = 0
+        for word, value in enumerate(self.used[board].tolist()):
+            mask |= value << (64 * word)
+        return mask
+
+    #  Создаем пачку из n полей со случайной расстановкой флота. Корабли ставятся по очереди сразу на всех
+    #  полях: каждому полю берется случайная позиция из всех позиций корабля, а поля, где она задела уже
+    #  поставленные корабли, пробуют еще раз. После PLACE_TRIES попыток оставшиеся поля выбирают позицию
+    #  равновероятно среди всех подходящих (как FleetPlacer._sample и _compatible). Занятые клетки хранятся
+    #  64-битными словами, поэтому проверка позиции - пара операций на поле. Поля, где подходящих позиций не
+    #  осталось, начинаются заново, а после PLACE_ROUNDS попыток остаток расставляется обычным FleetPlacer
+    #  с seed из rng.
+    @classmethod
+    def random(cls, n, size=6, ship_lens=None, rng=None):
+        boards = cls(n, size, ship_lens)
+        rng = rng if rng is not None else np.random.default_rng()
+        placer = FleetPlacer.get(size, boards.ship_lens)
+        #  Флот, который точно не помещается на поле, сразу отклоняем, как это делает FleetPlacer.place.
+        if not placer.fits_area():
+            raise FleetPlacementException()
+        tables = {}
+        for length in set(boards.ship_lens):
+            options = placer.placements[length]
+            #  Номера клеток каждой позиции: по ним корабль ставится в ship_id без прохода по всему полю.
+            cells = np.array([option[5] for option in options], dtype=np.intp)
+            halo = boards._words([option[1] for option in options])
+            #  Для проверок маски храним по словам (слово, позиция): так каждая проверка - операция над строкой.
+            tables[length] = (boards._words([option[0] for option in options]).T.copy(), halo.T.copy(), halo, cells)
+
+        pending = np.arange(n)
+        for _ in range(PLACE_ROUNDS):
+            if not len(pending):
+                break
+            #  occupied[w, i] - слово w занятых клеток (корабли с окружностью) i-го из расставляемых полей.
+            occupied = np.zeros((boards.words, len(pending)), dtype=np.uint64)
+            chosen = np.zeros((boards.ships, len(pending)), dtype=np.intp)
+            placed = np.ones(len(pending), dtype=bool)
+            for number, length in enumerate(boards.ship_lens):
+                ship, halo, _, _ = tables[length]
+                #  rows - поля, которым еще нужна позиция для этого корабля.
+                rows = np.flatnonzero(placed)
+                for _ in range(PLACE_TRIES):
+                    options = rng.integers(ship.shape[1], size=len(rows))
+                    fits = np.ones(len(rows), dtype=bool)
+                    for word in range(boards.words):
+                        fits &= (ship[word].take(options) & occupied[word].take(rows)) == 0
+                    chosen[number, rows[fits]] = options[fits]
+                    rows = rows[~fits]
+                    if not len(rows):
+                        break
+                else:
+                    options = _pick_free(ship, occupied[:, rows], rng)
+                    chosen[number, rows] = options
+                    placed[rows[options < 0]] = False
+                for word in range(boards.words):
+                    occupied[word] |= halo[word].take(chosen[number])
+            done = pending[placed]
+            ship_id = boards.ship_id.reshape(-1)
+            for number, length in enumerate(boards.ship_lens):
+                _, _, halo, cells = tables[length]
+                options = chosen[number, placed]
+                ship_id[(done * boards.cells)[:, None] + cells[options]] = number + 1
+                boards.halo[done, number + 1] = halo[options]
+            boards.alive[done] = boards.ships
+            pending = pending[~placed]
+        if len(pending):
+            fallback = random.Random(int(rng.integers(1 << 63)))
+            for board in pending:
+                boards.load(board, [(option[5], option[1]) for option in placer.place(fallback)])
+        return boards
+
+    #  Создаем пачку из готовых полей BattleField одного размера.
+    @classmethod
+    def from_fields(cls, fields):
+        boards = cls(len(fields), fields[0].size, [ship.length for ship in fields[0].ships])
+        for board, field in enumerate(fields):
+            #  Корабли раскладываем в порядке ship_lens, что бы жизни совпали с длинами.
+            masks = sorted(zip((ship.length for ship in field.ships), field.ship_masks), key=lambda item: -item[0])
+            boards.load(board, [(field.mask_cells(mask), field.around_mask(mask)) for _, mask in masks])
+        return boards
+
+    #  Ставим флот на поле board. ships - пары (клетки корабля, маска корабля с окружностью) в порядке ship_lens.
+    def load(self, board, ships):
+        self.ship_id[board] = 0
+        for number, (cells, halo) in enumerate(ships, 1):
+            self.ship_id[board, list(cells)] = number
+            self.halo[board, number] = self._words([halo])[0]
+        self.used[board] = 0
+        self.hit_points[board, 1:] = self.ship_lens
+        self.alive[board] = len(ships)
+
+    #  Один шаг: выстрел по каждому полю из boards в соответствующую клетку из cells. Каждое поле может
+    #  встречаться в boards не больше одного раза. Возвращает массив MISS, HIT или SUNK по каждому выстрелу.
+    def step(self, boards, cells):
+        boards = np.asarray(boards, dtype=np.intp)
+        cells = np.asarray(cells, dtype=np.intp)
+        if ((cells < 0) | (cells >= self.cells)).any():
+            raise PointOutFieldException()
+        #  С массивами работаем через плоские номера: take/put по ним дешевле двумерной индексации.
+        flat = boards * self.cells + cells
+        slots, bits = self._bits(boards, cells)
+        used = self.used.reshape(-1)
+        words = used.take(slots)
+        if (words & bits).any():
+            raise PointUsedException()
+        used.put(slots, words | bits)
+        numbers = self.ship_id.reshape(-1).take(flat).astype(np.intp)
+        hit = numbers > 0
+        #  Поля в шаге не повторяются, поэтому вычитание по индексам не теряет ни одного попадания.
+        ship_slots = boards[hit] * (self.ships + 1) + numbers[hit]
+        hit_points = self.hit_points.reshape(-1)
+        left = hit_points.take(ship_slots) - 1
+        hit_points.put(ship_slots, left)
+        sunk = np.zeros(len(boards), dtype=bool)
+        sunk[hit] = left == 0
+        if sunk.any():
+            sunk_boards = boards[sunk]
+            self.alive[sunk_boards] -= 1
+            #  Потопленный корабль и его окружность становятся занятыми.
+            self.used[sunk_boards] |= self.halo[sunk_boards, numbers[sunk]]
+        results = hit.astype(np.int8)
+        results[sunk] = SUNK
+        return results
+
+    #  Для пар (поле, клетка): номер слова в плоском массиве used и бит клетки в этом слове.
+    def _bits(self, boards, cells):
+        slots = boards * self.words + (cells >> 6)
+        bits = np.left_shift(np.uint64(1), (cells & 63).astype(np.uint64))
+        return slots, bits
+
+    #  Выстрел по одному полю, для проверки и ручной игры. Возвращает MISS, HIT или SUNK.
+    def shoot(self, board, cell) -> int:
+        return int(self.step([board], [cell])[0])
+
+    #  Случайные свободные клетки для каждого поля из boards. Каждое поле при первом вызове получает случайный
+    #  порядок всех клеток, и выстрел делается в следующую по порядку свободную клетку - это то же самое, что
+    #  равновероятный выбор среди свободных клеток, но без просмотра всего поля на каждом шаге. Возвращенные
+    #  клетки нужно обстрелять (step) до следующего вызова: порядок поля сдвигается за выбранную клетку.
+    def random_targets(self, boards, rng):
+        if self.order is None:
+            self.order = self._shuffled_cells(rng)
+            self.position = np.zeros(self.n, dtype=np.intp)
+        boards = np.asarray(boards, dtype=np.intp)
+        order = self.order.reshape(-1)
+        used = self.used.reshape(-1)
+        position = self.position[boards]
+        cells = order.take(boards * self.cells + position).astype(np.intp)
+        #  Пропускаем клетки, которые уже заняты (выстрелы и окружность потопленных кораблей): у таких полей
+        #  смотрим TARGET_WINDOW следующих клеток порядка сразу и берем первую свободную, дальше ищут только поля,
+        #  у которых все клетки окна заняты. Свободная клетка есть всегда, пока на поле остался живой корабль.
+        window = np.arange(TARGET_WINDOW)
+        todo = np.flatnonzero(self._busy(used, boards, cells))
+        while len(todo):
+            index = np.minimum(position[todo, None] + window, self.cells - 1)
+            candidates = order.take(boards[todo, None] * self.cells + index).astype(np.intp)
+            free = ~self._busy(used, boards[todo, None], candidates)
+            found = free.any(axis=1)
+            first = free.argmax(axis=1)[found]
+            rows = todo[found]
+            position[rows] += first
+            cells[rows] = candidates[found, first]
+            position[todo[~found]] += TARGET_WINDOW
+            todo = todo[~found]
+        #  Возвращенные клетки сразу обстреливаются, поэтому следующий поиск начинается со следующей клетки порядка.
+        self.position[boards] = position + 1
+        return cells
+
+    #  Случайный порядок клеток для каждого поля. Вместо перестановки каждой строки по отдельности сортируем
+    #  64-битные ключи: в старших битах случайное число, в младших - номер клетки. Одна сортировка всего массива
+    #  примерно вдвое быстрее построчного rng.permuted, а совпадение случайных частей ключей практически исключено.
+    def _shuffled_cells(self, rng):
+        bits = max(self.cells - 1, 1).bit_length()
+        low = np.uint64((1 << bits) - 1)
+        order = np.empty((self.n, self.cells), dtype=np.int16)
+        for start in range(0, self.n, ORDER_CHUNK):
+            rows = min(ORDER_CHUNK, self.n - start)
+            keys = rng.integers(1 << (64 - bits), size=(rows, self.cells), dtype=np.uint64) << np.uint64(bits)
+            keys |= np.arange(self.cells, dtype=np.uint64)
+            keys.sort(axis=1)
+            order[start:start + rows] = keys & low
+        return order
+
+    def _busy(self, used, boards, cells):
+        slots, bits = self._bits(boards, cells)
+        return (used.take(slots) & bits) != 0
+
+    #  Все корабли на поле board потоплены.
+    def defeated(self, board) -> bool:
+        return self.alive[board] == 0
+
+
+#  Для каждого поля (столбца occupied) - случайная позиция из ship, не задевающая занятые клетки, или -1, если таких
+#  нет. ship и occupied - маски словами: [слово, позиция] и [слово, поле]. Поля проверяются частями, что бы
+#  таблица "поле x позиция" не занимала много памяти.
+def _pick_free(ship, occupied, rng):
+    count = occupied.shape[1]
+    chosen = np.full(count, -1, dtype=np.intp)
+    step = max(1, PICK_CHUNK // ship.shape[1])
+    for start in range(0, count, step):
+        free = np.ones((min(step, count - start), ship.shape[1]), dtype=bool)
+        for word in range(len(ship)):
+            free &= (occupied[word, start:start + step, None] & ship[word]) == 0
+        counts = free.sum(axis=1)
+        #  Номер подходящей позиции по порядку, затем ее место среди всех позиций.
+        pick = (rng.random(len(free)) * counts).astype(np.intp)
+        options = (free.cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+        chosen[start:start + step] = np.where(counts > 0, options, -1)
+    return chosen
+
+
+#  Играем n_games партий случайный бот против случайного бота в пакетном режиме. Поля игрока a - это поля
+#  0 ... n_games - 1, поля игрока b - n_games ... 2 * n_games - 1. Возвращает статистику как simulation.simulate.
+def simulate_batch(n_games, size=6, ship_lens=None, seed=0):
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    boards = BatchBoards.random(2 * n_games, size, ship_lens, rng)
+    #  current[g] - кто стреляет в партии g (0 - a, 1 - b), стреляющий бьет по полю соперника.
+    current = rng.integers(2, size=n_games)
+    shots = np.zeros((n_games, 2), dtype=np.int32)
+    turns = np.ones(n_games, dtype=np.int32)
+    active = np.arange(n_games)
+    wins = np.zeros(2, dtype=np.int64)
+    shots_to_win = Counter()
+    turns_counter = Counter()
+    while len(active):
+        player = current[active]
+        targets = active + n_games * (1 - player)
+        results = boards.step(targets, boards.random_targets(targets, rng))
+        shots[active, player] += 1
+        finished = (results == SUNK) & (boards.alive[targets] == 0)
+        if finished.any():
+            games = active[finished]
+            winners = player[finished]
+            wins += np.bincount(winners, minlength=2)
+            shots_to_win.update(shots[games, winners].tolist())
+            turns_counter.update(turns[games].tolist())
+        #  При промахе ход переходит сопернику, при попадании - дополнительный ход.
+        missed = active[results == MISS]
+        current[missed] ^= 1
+        turns[missed] += 1
+        active = active[~finished]
+
+    wins = wins.tolist()
+    return {
+        "games": n_games,
+        "strategy_a": "random",
+        "strategy_b": "random",
+        "wins_a": wins[0],
+        "wins_b": wins[1],
+        "win_rate_a": wins[0] / n_games if n_games else 0.0,
+        "win_rate_b": wins[1] / n_games if n_games else 0.0,
+        "shots_to_win": dict(sorted(shots_to_win.items())),
+        "turns": dict(sorted(turns_counter.items())),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная симуляция партий случайных ботов.")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="количество партий")
+    parser.add_argument("--size", type=int, default=6, help="размер поля")
+    parser.add_argument("--fleet", help="длины кораблей через запятую, например 4,3,3,2,2,2,1,1,1,1")
+    parser.add_argument("--preset", choices=sorted(Game.PRESETS), help="готовая настройка поля и флота")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    size = args.size
+    ship_lens = [int(length) for length in args.fleet.split(",")] if args.fleet else None
+    if args.preset:
+        size, ship_lens = Game.PRESETS[args.preset]
+
+    stats = simulate_batch(args.games, size, ship_lens, seed=args.seed)
+    print(f"Партий сыграно: {stats['games']}")
+    print(f"Победы a: {stats['wins_a']} ({stats['win_rate_a']:.1%})")
+    print(f"Победы b: {stats['wins_b']} ({stats['win_rate_b']:.1%})")
+
+
+if __name__ == '__main__':
+    main()
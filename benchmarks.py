@@ -0,0 +1,236 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from See_Battle_upd import BattleField, Bot, FleetPlacer, Game, HunterBot, Point, Ship, priors
+from simulation import play_game
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Набор замеров производительности для горячих мест игры. Каждый замер выполняется на нескольких размерах
+#  поля и флотах, выдает количество операций в секунду и пиковый объем выделенной памяти. Результаты можно
+#  сохранить в JSON и сравнить с сохраненной ранее базовой линией, что бы заметить замедление.
+#
+#  Пример: python benchmarks.py --save baseline.json
+#          python benchmarks.py --baseline baseline.json
+#  -----------------------------------------------------------------------------------------------
+
+#  Конфигурации (имя, размер поля, длины кораблей).
+CONFIGS = [
+    ("6x6", 6, [3, 2, 2, 1, 1, 1, 1]),
+    ("10x10", 10, [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]),
+    ("20x20", 20, [5, 4, 4, 3, 3, 3, 2, 2, 2, 2, 1, 1, 1, 1, 1]),
+]
+
+#  Допустимое падение ops/sec относительно базовой линии, после которого замер считается регрессией.
+DEFAULT_TOLERANCE = 0.2
+
+
+#  Набор готовых полей для конфигурации, что бы генерация флота не попадала в замеры других операций.
+def _fields(size, ship_lens, count, rng):
+    return list(FleetPlacer.get(size, ship_lens).generate_fleets(count, rng.random()))
+
+
+#  Каждый замер получает конфигурацию и количество повторов, а возвращает (время в секундах, число операций).
+def bench_ship_points(size, ship_lens, rounds, rng):
+    starts = [(rng.randrange(size), rng.randrange(size), rng.choice(ship_lens), rng.randrange(4))
+              for _ in range(256)]
+    ops = 0
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        for x, y, length, rotation in starts:
+            Ship(Point(x, y), length, rotation).points
+        ops += len(starts)
+    return time.perf_counter() - begin, ops
+
+
+def bench_add_ship(size, ship_lens, rounds, rng):
+    fleets = []
+    for field in _fields(size, ship_lens, 16, rng):
+        fleets.append([Ship(ship.start_pos, ship.length, ship.rotation) for ship in field.ships])
+    ops = 0
+    elapsed = 0.0
+    for _ in range(rounds):
+        for ships in fleets:
+            field = BattleField(size=size)
+            begin = time.perf_counter()
+            for ship in ships:
+                field.add_ship(ship)
+            elapsed += time.perf_counter() - begin
+            ops += len(ships)
+    return elapsed, ops
+
+
+def bench_around_ship(size, ship_lens, rounds, rng):
+    fields = _fields(size, ship_lens, 16, rng)
+    ops = 0
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        for field in fields:
+            for ship in field.ships:
+                field.around_ship(ship, hid_points=True)
+            ops += len(field.ships)
+    return time.perf_counter() - begin, ops
+
+
+def bench_shot(size, ship_lens, rounds, rng):
+    cells = [Point(x, y) for x in range(size) for y in range(size)]
+    ops = 0
+    elapsed = 0.0
+    for _ in range(rounds):
+        field = FleetPlacer.get(size, ship_lens).create_field(rng)
+        order = cells[:]
+        rng.shuffle(order)
+        begin = time.perf_counter()
+        for point in order:
+            if not field.used_mask & field.bit(point):
+                field.shot(point)
+                ops += 1
+        elapsed += time.perf_counter() - begin
+    return elapsed, ops
+
+
+def _bench_bot(bot_class, size, ship_lens, rounds, rng):
+    ops = 0
+    elapsed = 0.0
+    for _ in range(rounds):
+        field = FleetPlacer.get(size, ship_lens).create_field(rng)
+        bot = bot_class(None, field)
+        while not field.victory():
+            begin = time.perf_counter()
+            point = bot.request()
+            elapsed += time.perf_counter() - begin
+            ops += 1
+            field.shot(point)
+    return elapsed, ops
+
+
+def bench_bot_request(size, ship_lens, rounds, rng):
+    return _bench_bot(Bot, size, ship_lens, rounds, rng)
+
+
+def bench_hunter_request(size, ship_lens, rounds, rng):
+    return _bench_bot(HunterBot, size, ship_lens, rounds, rng)
+
+
+def bench_random_creation(size, ship_lens, rounds, rng):
+    game = Game(size)
+    game.ship_lens = list(ship_lens)
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        game.random_creation()
+    return time.perf_counter() - begin, rounds
+
+
+def bench_full_game(size, ship_lens, rounds, rng):
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        play_game("random", "random", size, ship_lens)
+    return time.perf_counter() - begin, rounds
+
+
+#  Имя замера -> (функция, количество повторов за один проход).
+BENCHMARKS = {
+    "ship_points": (bench_ship_points, 20),
+    "add_ship": (bench_add_ship, 20),
+    "around_ship": (bench_around_ship, 20),
+    "shot": (bench_shot, 20),
+    "bot_request": (bench_bot_request, 10),
+    "hunter_request": (bench_hunter_request, 3),
+    "random_creation": (bench_random_creation, 50),
+    "full_game": (bench_full_game, 10),
+}
+
+
+#  Запускаем один замер: сначала прогрев, затем повторяем проходы, пока не наберется min_time секунд,
+#  и отдельный проход под tracemalloc для оценки памяти. Кэш дебютов (priors) на время замера выключается,
+#  иначе прогрев заполнит его и замер ботов покажет скорость чтения из кэша, а не скорость самого бота.
+def run_benchmark(name, size, ship_lens, min_time=0.2, seed=0):
+    function, rounds = BENCHMARKS[name]
+    rng = random.Random(seed)
+    random.seed(seed)
+    enabled = priors.enabled
+    priors.enabled = False
+    try:
+        function(size, ship_lens, 1, rng)
+        elapsed = 0.0
+        ops = 0
+        while elapsed < min_time:
+            spent, done = function(size, ship_lens, rounds, rng)
+            elapsed += spent
+            ops += done
+        tracemalloc.start()
+        function(size, ship_lens, 1, rng)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        priors.enabled = enabled
+    return {
+        "ops": ops,
+        "seconds": elapsed,
+        "ops_per_sec": ops / elapsed if elapsed else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+#  Запускаем все выбранные замеры на всех конфигурациях. Ключ результата - "замер/конфигурация".
+def run_all(names=None, configs=None, min_time=0.2, seed=0):
+    results = {}
+    for config_name, size, ship_lens in configs or CONFIGS:
+        for name in names or BENCHMARKS:
+            results[f"{name}/{config_name}"] = run_benchmark(name, size, ship_lens, min_time, seed)
+    return results
+
+
+#  Сравниваем результаты с базовой линией и возвращаем список регрессий (ключ, было ops/sec, стало ops/sec).
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if result["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+            regressions.append((key, old["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности игры.")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="какие замеры запускать")
+    parser.add_argument("--configs", nargs="*", choices=[name for name, _, _ in CONFIGS],
+                        help="на каких конфигурациях запускать")
+    parser.add_argument("--min-time", type=float, default=0.2, help="минимальное время одного замера, сек")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="сравнить с результатами из JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое падение ops/sec (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    configs = [config for config in CONFIGS if not args.configs or config[0] in args.configs]
+    results = run_all(args.only, configs, args.min_time, args.seed)
+
+    print(f"{'замер':<32}{'ops/sec':>14}{'пик, KiB':>12}")
+    for key, result in results.items():
+        print(f"{key:<32}{result['ops_per_sec']:>14,.0f}{result['peak_kib']:>12.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, old, new in regressions:
+            print(f"Регрессия {key}: {old:,.0f} -> {new:,.0f} ops/sec")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import random
+import time
+from multiprocessing import Pool
+
+from See_Battle_upd import FleetPlacer, HunterBot, priors
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Бот, который стреляет по результатам метода Монте-Карло. По тому, что видно на радаре (промахи, попадания,
+#  потопленные корабли с их окружностью), он составляет много случайных расстановок оставшихся кораблей,
+#  которые не противоречат этим данным, и стреляет в клетку, которая чаще всего занята кораблем в этих
+#  расстановках. Расстановки, оставшиеся верными после хода, переиспользуются, новые добираются в пределах
+#  времени на ход, при workers > 1 - параллельно в нескольких процессах.
+#  -----------------------------------------------------------------------------------------------
+
+#  Индексы "клетка -> позиции корабля длины length, проходящие через клетку" по ключу (size, length).
+_cell_index = {}
+
+
+def _positions_through(placer, length):
+    key = (placer.size, length)
+    index = _cell_index.get(key)
+    if index is None:
+        index = [[] for _ in range(placer.size * placer.size)]
+        for option in placer.placements[length]:
+            for cell in option[5]:
+                index[cell].append(option)
+        _cell_index[key] = index
+    return index
+
+
+#  Одна случайная расстановка кораблей длин lengths, которая не задевает клетки blocked и накрывает все
+#  клетки wounded. Возвращает список (длина, маска, клетки) или None, если расстановка зашла в тупик.
+def sample_fleet(placer, lengths, blocked, wounded, rng=random):
+    remaining = sorted(lengths, reverse=True)
+    #  occupied - клетки, куда нельзя ставить корабль: blocked и поставленные корабли вместе с окружностью.
+    occupied = blocked
+    covered = 0
+    ships = []
+    while remaining:
+        uncovered = wounded & ~covered
+        if uncovered:
+            #  Сначала накрываем попадания: ищем корабль, проходящий через первое не накрытое попадание.
+            target = (uncovered & -uncovered).bit_length() - 1
+            candidates = []
+            for length in set(remaining):
+                for option in _positions_through(placer, length)[target]:
+                    if not option[0] & occupied:
+                        candidates.append((length, option))
+            if not candidates:
+                return None
+            length, option = rng.choice(candidates)
+        else:
+            length = remaining[0]
+            option = placer._sample(length, occupied, rng)
+            if option is None:
+                options = placer._compatible(length, occupied)
+                if not options:
+                    return None
+                option = rng.choice(options)
+        ships.append((length, option[0], option[5]))
+        remaining.remove(length)
+        occupied |= option[1]
+        covered |= option[0]
+    if wounded & ~covered:
+        return None
+    return ships
+
+
+#  Набираем до count расстановок, пока не выйдет время budget (в секундах). Функция запускается и в других
+#  процессах, поэтому принимает только простые значения.
+def sample_fleets(size, fleet, lengths, blocked, wounded, count, budget, seed=None):
+    rng = random.Random(seed)
+    placer = FleetPlacer.get(size, fleet)
+    deadline = time.perf_counter() + budget
+    samples = []
+    attempts = 0
+    while len(samples) < count:
+        #  Время проверяем не на каждой попытке, что бы не тратить на это лишнего.
+        attempts += 1
+        if attempts % 8 == 0 and time.perf_counter() > deadline:
+            break
+        ships = sample_fleet(placer, lengths, blocked, wounded, rng)
+        if ships is not None:
+            samples.append(ships)
+    return samples
+
+
+def _sample_task(args):
+    return sample_fleets(*args)
+
+
+class MonteCarloBot(HunterBot):
+    #  samples - сколько расстановок держать, budget - сколько секунд можно тратить на добор расстановок за ход,
+    #  workers - количество процессов для добора.
+    def __init__(self, field, radar, samples=200, budget=0.02, workers=1):
+        super().__init__(field, radar)
+        self.samples = samples
+        self.budget = budget
+        self.workers = workers
+        self._process_pool = None
+        self._fleets = []
+        self._fleets_radar = None
+        self._fleets_used = 0
+        self._sunk_seen = set()
+
+    #  Закрываем процессы добора, если они были запущены.
+    def close(self):
+        if self._process_pool is not None:
+            self._process_pool.terminate()
+            self._process_pool = None
+
+    #  Убираем из сохраненных расстановок те, что противоречат новым данным радара.
+    def _prune(self, misses, wounded):
+        radar = self.radar
+        #  Если радар поменялся или выстрелы были отменены (restore, undo) - расстановки набираются заново.
+        if self._fleets_radar is not radar or self._fleets_used & ~radar.used_mask:
+            self._fleets_radar = radar
+            self._fleets = []
+            self._sunk_seen = set()
+        #  Потопленный корабль должен стоять в расстановке ровно там же, дальше он из нее убирается.
+        sunk = []
+        for index, ship in enumerate(radar.ships):
+            if ship.hit_points == 0 and index not in self._sunk_seen:
+                self._sunk_seen.add(index)
+                sunk.append((ship.length, radar.ship_masks[index]))
+        kept = []
+        for ships in self._fleets:
+            ships = list(ships)
+            valid = True
+            for length, mask in sunk:
+                for position, (ship_length, ship_mask, _) in enumerate(ships):
+                    if ship_length == length and ship_mask == mask:
+                        del ships[position]
+                        break
+                else:
+                    valid = False
+                    break
+            if not valid:
+                continue
+            cells = 0
+            for _, mask, _ in ships:
+                cells |= mask
+            if cells & misses or wounded & ~cells:
+                continue
+            kept.append(ships)
+        self._fleets = kept
+        self._fleets_used = radar.used_mask
+
+    #  Добираем новые расстановки до self.samples.
+    def _top_up(self, fleet, lengths, blocked, wounded):
+        needed = self.samples - len(self._fleets)
+        if needed <= 0:
+            return
+        size = self.radar.size
+        if self.workers > 1:
+            if self._process_pool is None:
+                self._process_pool = Pool(self.workers)
+            share = -(-needed // self.workers)
+            tasks = [(size, fleet, lengths, blocked, wounded, share, self.budget, random.getrandbits(64))
+                     for _ in range(self.workers)]
+            for samples in self._process_pool.map(_sample_task, tasks):
+                self._fleets.extend(samples)
+        else:
+            self._fleets.extend(sample_fleets(size, fleet, lengths, blocked, wounded, needed, self.budget,
+                                              random.getrandbits(64)))
+
+    def choose_cell(self) -> int:
+        radar = self.radar
+        fleet = [ship.length for ship in radar.ships]
+        #  Первый выстрел не зависит от партии: вместо новых расстановок берем готовую априорную карту из кэша.
+        if not radar.used_mask and priors.enabled:
+            prior = priors.prior(radar.size, fleet, self.VARIANT)
+            best = max(prior)
+            return random.choice([cell for cell, value in enumerate(prior) if value == best])
+        lengths = [ship.length for ship in radar.ships if ship.hit_points > 0]
+        misses = radar.shot_mask & ~radar.hit_mask
+        wounded = radar.hit_mask & ~radar.sunk_mask
+        #  Оставшиеся корабли не могут стоять на промахах и касаться потопленных кораблей.
+        blocked = misses | radar.around_mask(radar.sunk_mask)
+
+        self._prune(misses, wounded)
+        self._top_up(fleet, lengths, blocked, wounded)
+
+        heat = [0] * (radar.size * radar.size)
+        for ships in self._fleets:
+            for _, _, cells in ships:
+                for cell in cells:
+                    heat[cell] += 1
+        best = 0
+        best_cells = []
+        for cell in radar.mask_cells(radar.full_mask & ~radar.used_mask):
+            value = heat[cell]
+            if value < best or not value:
+                continue
+            if value > best:
+                best = value
+                best_cells = [cell]
+            else:
+                best_cells.append(cell)
+        #  Если подходящих расстановок найти не удалось - стреляем как обычный бот-охотник.
+        if not best_cells:
+            return super().choose_cell()
+        return random.choice(best_cells)
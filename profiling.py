@@ -0,0 +1,168 @@
+import csv
+import functools
+import json
+import time
+
+from See_Battle_upd import BattleField, Bot, FleetPlacer, Game, Player
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Встроенные замеры горячих мест игры. По умолчанию выключены и ничего не стоят: методы классов подменяются
+#  обертками только в enable() и возвращаются обратно в disable(). Обертка считает количество вызовов,
+#  суммарное и максимальное время. Результат - словарь snapshot(), который можно сохранить в JSON или CSV.
+#
+#  Пример:
+#      profiler.enable()
+#      ... игры ...
+#      profiler.disable()
+#      profiler.export_json("profile.json")
+#  -----------------------------------------------------------------------------------------------
+
+#  Какие методы замеряются: (класс, имя метода, имя в отчете).
+TARGETS = [
+    (BattleField, "add_ship", "BattleField.add_ship"),
+    (BattleField, "around_ship", "BattleField.around_ship"),
+    (BattleField, "shot", "BattleField.shot"),
+    (Bot, "request", "Bot.request"),
+    (Player, "make_move", "Player.make_move"),
+    (Game, "random_creation", "Game.random_creation"),
+    #  Один ход в Game.logic (ввод игрока или выбор бота вместе с выстрелом).
+    (Game, "make_move", "Game.turn"),
+]
+
+
+class Profiler:
+    def __init__(self):
+        #  timings - имя -> [количество вызовов, суммарное время, максимальное время].
+        self.timings = {}
+        #  counters - простые счетчики (например, количество возвратов при расстановке флота).
+        self.counters = {}
+        self._originals = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def _stat(self, name) -> list:
+        return self.timings.setdefault(name, [0, 0.0, 0.0])
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    #  Обертка, которая замеряет время каждого вызова функции.
+    def _timed(self, name, function):
+        stat = self._stat(name)
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]:
+                    stat[2] = elapsed
+        return wrapper
+
+    #  Для FleetPlacer.place кроме времени считаем, сколько раз генератор флота возвращался назад. Через place
+    #  проходят все способы расстановки (Game.random_creation, стратегии расстановки simulation.PLACEMENTS).
+    def _place(self, function):
+        timed = self._timed("FleetPlacer.place", function)
+        profiler = self
+
+        @functools.wraps(function)
+        def wrapper(placer, *args, **kwargs):
+            before = placer.backtracks
+            try:
+                return timed(placer, *args, **kwargs)
+            finally:
+                profiler.count("FleetPlacer.place.backtracks", placer.backtracks - before)
+        return wrapper
+
+    def _patch(self, cls, attribute, wrapper):
+        self._originals.append((cls, attribute, cls.__dict__[attribute]))
+        setattr(cls, attribute, wrapper)
+
+    #  Включаем замеры: подменяем методы обертками.
+    def enable(self):
+        if self.enabled:
+            return
+        for cls, attribute, name in TARGETS:
+            self._patch(cls, attribute, self._timed(name, cls.__dict__[attribute]))
+        self._patch(FleetPlacer, "place", self._place(FleetPlacer.__dict__["place"]))
+
+    #  Выключаем замеры: возвращаем исходные методы. Накопленные данные остаются.
+    def disable(self):
+        while self._originals:
+            cls, attribute, original = self._originals.pop()
+            setattr(cls, attribute, original)
+
+    #  Профайлер с данными, сложенными из нескольких снимков (например, из разных процессов одной симуляции).
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        merged = cls()
+        for snapshot in snapshots:
+            for name, stat in snapshot["timings"].items():
+                total = merged._stat(name)
+                total[0] += stat["calls"]
+                total[1] += stat["total_sec"]
+                total[2] = max(total[2], stat["max_us"] / 1e6)
+            for name, value in snapshot["counters"].items():
+                merged.count(name, value)
+        return merged
+
+    #  Обнуляем данные. Списки очищаются на месте, потому что включенные обертки держат ссылки на них.
+    def reset(self):
+        for stat in self.timings.values():
+            stat[:] = [0, 0.0, 0.0]
+        self.counters.clear()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    #  Текущие данные в виде словаря: {"timings": {имя: {...}}, "counters": {имя: значение}}.
+    def snapshot(self) -> dict:
+        timings = {}
+        for name, (calls, total, longest) in self.timings.items():
+            if not calls:
+                continue
+            timings[name] = {
+                "calls": calls,
+                "total_sec": total,
+                "mean_us": total / calls * 1e6,
+                "max_us": longest * 1e6,
+            }
+        return {"timings": timings, "counters": dict(self.counters)}
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, indent=2, ensure_ascii=False)
+
+    #  В CSV каждая строка - один замер или счетчик.
+    def export_csv(self, path):
+        snapshot = self.snapshot()
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["name", "calls", "total_sec", "mean_us", "max_us", "value"])
+            for name, stat in snapshot["timings"].items():
+                writer.writerow([name, stat["calls"], stat["total_sec"], stat["mean_us"], stat["max_us"], ""])
+            for name, value in snapshot["counters"].items():
+                writer.writerow([name, "", "", "", "", value])
+
+    #  Сохраняем в JSON или CSV в зависимости от расширения файла.
+    def export(self, path):
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+
+#  Общий экземпляр для всей программы.
+profiler = Profiler()
@@ -0,0 +1,314 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import Counter
+
+from See_Battle_upd import BattleField, Game, Point, ShotFired, Ship
+from simulation import STRATEGIES
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Компактный двоичный формат записи партий. Файл начинается с сигнатуры MAGIC, дальше подряд идут записи:
+#
+#      заголовок  <IBBHQ  длина записи в байтах (вместе с заголовком), размер поля, количество кораблей
+#                         в одном флоте, количество выстрелов, seed партии
+#      флоты      <BBBB   x, y, длина и направление каждого корабля: сначала флот игрока 0, затем игрока 1
+#      выстрелы   номер клетки, в старшем бите - номер стрелявшего игрока. Если на поле не больше 128
+#                 клеток - один байт на выстрел, иначе два байта (<H).
+#
+#  Рядом с файлом записей лежит индекс (тот же путь + ".idx") - смещения начала каждой записи в <Q, по нему
+#  чтение партии номер N не требует просмотра файла. Если индекса нет или он описывает не весь файл, он строится
+#  проходом по длинам записей.
+#  -----------------------------------------------------------------------------------------------
+
+MAGIC = b"SBR1"
+HEADER = struct.Struct("<IBBHQ")
+SHIP = struct.Struct("<BBBB")
+OFFSET = struct.Struct("<Q")
+
+
+#  Запись одной партии. fleets - два списка кораблей (x, y, длина, направление), shots - список пар
+#  (номер стрелявшего игрока, номер клетки на поле соперника) в порядке выстрелов.
+class GameRecord:
+    def __init__(self, size, fleets, shots, seed=0):
+        self.size = size
+        self.fleets = fleets
+        self.shots = shots
+        self.seed = seed
+
+    #  Сколько байт занимает один выстрел на поле такого размера.
+    @staticmethod
+    def shot_width(size) -> int:
+        if size * size <= 0x80:
+            return 1
+        if size * size <= 0x8000:
+            return 2
+        raise ValueError(f"Поле {size}x{size} слишком большое для формата записи")
+
+    #  Собираем запись по объекту Game и событиям партии (игрок 0 - game.user, игрок 1 - game.bot).
+    @classmethod
+    def from_game(cls, game, events, seed=0):
+        fleets = []
+        for field in (game.user.field, game.bot.field):
+            fleets.append([(ship.start_pos.x, ship.start_pos.y, ship.length, ship.rotation) for ship in field.ships])
+        shots = []
+        for event in events:
+            if isinstance(event, ShotFired):
+                shots.append((0 if event.player is game.user else 1, event.point.x * game.size + event.point.y))
+        return cls(game.size, fleets, shots, seed)
+
+    def encode(self) -> bytes:
+        ships = len(self.fleets[0])
+        if len(self.fleets[1]) != ships:
+            raise ValueError("Флоты игроков должны состоять из одинакового количества кораблей")
+        width = self.shot_width(self.size)
+        high_bit = 0x80 if width == 1 else 0x8000
+        body = bytearray()
+        for fleet in self.fleets:
+            for x, y, length, rotation in fleet:
+                body += SHIP.pack(x, y, length, rotation)
+        packed = [cell | (high_bit if player else 0) for player, cell in self.shots]
+        body += bytes(packed) if width == 1 else struct.pack(f"<{len(packed)}H", *packed)
+        header = HEADER.pack(HEADER.size + len(body), self.size, ships, len(self.shots),
+                             self.seed & 0xFFFFFFFFFFFFFFFF)
+        return header + bytes(body)
+
+    #  Читаем запись из буфера buffer (bytes или mmap) начиная с позиции offset.
+    @classmethod
+    def decode(cls, buffer, offset=0):
+        _, size, ships, shot_count, seed = HEADER.unpack_from(buffer, offset)
+        position = offset + HEADER.size
+        fleets = []
+        for _ in range(2):
+            fleet = []
+            for _ in range(ships):
+                fleet.append(SHIP.unpack_from(buffer, position))
+                position += SHIP.size
+            fleets.append(fleet)
+        width = cls.shot_width(size)
+        if width == 1:
+            raw = buffer[position:position + shot_count]
+            shots = [(value >> 7, value & 0x7F) for value in raw]
+        else:
+            raw = struct.unpack_from(f"<{shot_count}H", buffer, position)
+            shots = [(value >> 15, value & 0x7FFF) for value in raw]
+        return cls(size, fleets, shots, seed)
+
+    #  Восстанавливаем поля игроков и проигрываем все выстрелы. Возвращает два поля после партии.
+    def replay(self) -> tuple:
+        fields = []
+        for fleet in self.fleets:
+            field = BattleField(size=self.size)
+            for x, y, length, rotation in fleet:
+                field.add_ship(Ship(Point(x, y), length, rotation))
+            field.preparation()
+            fields.append(field)
+        for player, cell in self.shots:
+            fields[1 - player].shot(Point(cell // self.size, cell % self.size))
+        return fields[0], fields[1]
+
+    #  Номер победителя (тот, кто сделал последний выстрел) или None для пустой записи.
+    @property
+    def winner(self):
+        return self.shots[-1][0] if self.shots else None
+
+
+#  Запись партий в файл. Файл и индекс открываются на дозапись, поэтому можно дописывать в уже существующий.
+class GameRecorder:
+    def __init__(self, path):
+        self.path = path
+        data = b""
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                data = file.read(len(MAGIC) + 1)
+        #  Пустой файл или файл, оборвавшийся на сигнатуре, начинаем заново вместе с индексом.
+        if len(data) <= len(MAGIC) and MAGIC.startswith(data):
+            with open(path, "wb") as file:
+                file.write(MAGIC)
+            open(path + ".idx", "wb").close()
+            self._offset = len(MAGIC)
+        else:
+            self._offset = self._recover()
+        self._file = open(path, "ab")
+        self._index = open(path + ".idx", "ab")
+
+    #  Перед дозаписью в существующий файл приводим его в порядок: недописанный хвост отрезается, иначе новые
+    #  записи оказались бы после мусора, а индекс, которого нет или который не описывает весь файл, записывается
+    #  заново. Возвращает смещение конца последней целой записи.
+    def _recover(self) -> int:
+        with GameReader(self.path) as reader:
+            offsets = reader.offsets
+            end = reader.end
+            stale = not reader.from_index
+        if end < os.path.getsize(self.path):
+            with open(self.path, "r+b") as file:
+                file.truncate(end)
+        if stale:
+            with open(self.path + ".idx", "wb") as file:
+                file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        return end
+
+    #  Сначала дописываем запись, потом ее смещение в индекс: если запись прервется, индекс не будет указывать
+    #  на несуществующие данные (а недописанный хвост GameReader отбросит).
+    def write(self, record):
+        data = record.encode()
+        self._file.write(data)
+        self._file.flush()
+        self._index.write(OFFSET.pack(self._offset))
+        self._offset += len(data)
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+#  Чтение файла партий через mmap: записи не копируются и не разбираются, пока к ним не обратились.
+class GameReader:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} не является файлом записей партий")
+        #  from_index - смещения взяты из файла индекса (False - индекса не было или он не годился).
+        self.from_index = False
+        self.offsets = self._load_index()
+        #  end - конец последней целой записи. Все, что лежит в файле дальше, - недописанный хвост.
+        self.end = len(MAGIC)
+        if self.offsets:
+            self.end = self.offsets[-1] + HEADER.unpack_from(self._map, self.offsets[-1])[0]
+
+    #  Берем смещения из индекса, а если его нет или он не совпадает с файлом - строим заново.
+    def _load_index(self):
+        index_path = self.path + ".idx"
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as file:
+                raw = file.read()
+            count = len(raw) // OFFSET.size
+            offsets = list(struct.unpack(f"<{count}Q", raw[:count * OFFSET.size]))
+            #  Индекс с недописанным смещением в конце тоже не годится: дозапись после него сбила бы все смещения.
+            if len(raw) == count * OFFSET.size and self._index_valid(offsets):
+                self.from_index = True
+                return offsets
+        return self.build_index()
+
+    #  Индекс годится, только если он описывает весь файл: первая запись начинается сразу после MAGIC, каждая
+    #  следующая - ровно там, где кончается предыдущая, а последняя кончается в конце файла. Иначе, например,
+    #  индекс, начатый заново при дозаписи в существующий файл, потерял бы записи, которых в нем нет.
+    def _index_valid(self, offsets) -> bool:
+        position = len(MAGIC)
+        end = len(self._map)
+        for offset in offsets:
+            if offset != position or offset + HEADER.size > end:
+                return False
+            length = HEADER.unpack_from(self._map, offset)[0]
+            if length < HEADER.size:
+                return False
+            position += length
+        return position == end
+
+    #  Проходим по файлу, перескакивая от записи к записи по их длинам. Недописанная последняя запись
+    #  (например, после сбоя во время записи) в индекс не попадает.
+    def build_index(self) -> list:
+        offsets = []
+        position = len(MAGIC)
+        end = len(self._map)
+        while position + HEADER.size <= end:
+            length = HEADER.unpack_from(self._map, position)[0]
+            if length < HEADER.size or position + length > end:
+                break
+            offsets.append(position)
+            position += length
+        return offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, number) -> GameRecord:
+        return GameRecord.decode(self._map, self.offsets[number])
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield GameRecord.decode(self._map, offset)
+
+    #  Быстрый проход только по заголовкам: (размер поля, количество выстрелов, seed) каждой записи.
+    def scan_headers(self):
+        for offset in self.offsets:
+            _, size, _, shot_count, seed = HEADER.unpack_from(self._map, offset)
+            yield size, shot_count, seed
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+#  Играем партию через пошаговый API Game без вывода и возвращаем ее запись.
+def play_recorded_game(strategy_a="random", strategy_b="random", size=6, ship_lens=None, seed=0):
+    random.seed(seed)
+    game = Game(size, ship_lens)
+    field_a = game.random_creation()
+    field_b = game.random_creation()
+    game.user = STRATEGIES[strategy_a](field_a, field_b)
+    game.bot = STRATEGIES[strategy_b](field_b, field_a)
+    game.begin()
+    events = []
+    while game.winner is None:
+        game.apply_shot(game.current, game.current.request())
+        events.extend(game.events())
+    return GameRecord.from_game(game, events, seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и анализ партий в двоичном формате.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="сыграть партии и дописать их в файл")
+    generate.add_argument("path")
+    generate.add_argument("-n", "--games", type=int, default=1000)
+    generate.add_argument("-a", "--strategy-a", default="random", choices=sorted(STRATEGIES))
+    generate.add_argument("-b", "--strategy-b", default="random", choices=sorted(STRATEGIES))
+    generate.add_argument("--size", type=int, default=6, help="размер поля")
+    generate.add_argument("--fleet", help="длины кораблей через запятую, например 4,3,3,2,2,2,1,1,1,1")
+    generate.add_argument("--preset", choices=sorted(Game.PRESETS), help="готовая настройка поля и флота")
+    generate.add_argument("--seed", type=int, default=0)
+    stats = commands.add_parser("stats", help="статистика по файлу партий")
+    stats.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        size = args.size
+        ship_lens = [int(length) for length in args.fleet.split(",")] if args.fleet else None
+        if args.preset:
+            size, ship_lens = Game.PRESETS[args.preset]
+        with GameRecorder(args.path) as recorder:
+            for number in range(args.games):
+                recorder.write(play_recorded_game(args.strategy_a, args.strategy_b, size, ship_lens,
+                                                  seed=args.seed + number))
+        print(f"Записано партий: {args.games}")
+    else:
+        with GameReader(args.path) as reader:
+            shots = Counter(shot_count for _, shot_count, _ in reader.scan_headers())
+            wins = Counter(record.winner for record in reader)
+        total = sum(shots.values())
+        print(f"Партий в файле: {total}")
+        if total:
+            print(f"Среднее количество выстрелов за партию: {sum(k * v for k, v in shots.items()) / total:.2f}")
+            print(f"Победы игрока 0: {wins[0]}, игрока 1: {wins[1]}")
+
+
+if __name__ == '__main__':
+    main()
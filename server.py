@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+
+from See_Battle_upd import (BattleField, Bot, Game, GameException, GameOver, Point, Ship, User, WrongShipException,
+                            side_by_side)
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Асинхронный сервер игры. Протокол - обычные текстовые строки по TCP: сервер присылает сообщения и поля,
+#  клиент отвечает одной строкой (координаты "x y", направление корабля или выбор режима). Каждое подключение
+#  получает свою игровую сессию со своим объектом Game, ввод игрока и паузы перед ходом бота ожидаются через
+#  await, поэтому один процесс обслуживает сразу много игроков.
+#
+#  Пример: python server.py --port 8888, подключиться можно например через nc localhost 8888.
+#  -----------------------------------------------------------------------------------------------
+
+LINE = '-' * 80
+
+
+#  Исключение, которое завершает сессию (игрок отключился или слишком долго не отвечал).
+class SessionClosed(Exception):
+    pass
+
+
+#  Класс одной игровой сессии (одно подключение - одна игра против бота).
+class Session:
+    def __init__(self, reader, writer, size=6, idle_timeout=300.0, delay=1.0, ship_lens=None):
+        self.reader = reader
+        self.writer = writer
+        self.idle_timeout = idle_timeout
+        self.delay = delay
+        self.game = Game(size, ship_lens)
+
+    #  Отправляем игроку текст. Ждем, пока буфер отправки освободится, что бы медленный клиент не копил память.
+    async def send(self, text):
+        self.writer.write((text + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+    #  Ждем строку от игрока. Если игрок отключился или молчит дольше idle_timeout - сессия закрывается.
+    async def receive(self, prompt) -> str:
+        await self.send(prompt)
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.idle_timeout)
+        except asyncio.TimeoutError:
+            await self.send("Адмирал, вы слишком долго не отдавали приказов. Сеанс связи завершен.")
+            raise SessionClosed()
+        if not line:
+            raise SessionClosed()
+        return line.decode("utf-8", errors="replace").strip()
+
+    #  Пауза, которая не блокирует другие сессии.
+    async def pause(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    #  Просим игрока ввести координаты точки одной строкой: "x y".
+    async def ask_point(self):
+        while True:
+            parts = (await self.receive("Введите координаты x и y через пробел:")).split()
+            if len(parts) != 2 or not all(part.isdigit() for part in parts):
+                await self.send("Введите корректные координаты!")
+                continue
+            return Point(int(parts[0]) - 1, int(parts[1]) - 1)
+
+    #  Просим игрока ввести число от low до high.
+    async def ask_number(self, prompt, low, high) -> int:
+        while True:
+            answer = await self.receive(prompt)
+            if not answer.isdigit() or not low <= int(answer) <= high:
+                await self.send("Введены некорректные данные!")
+                continue
+            return int(answer)
+
+    async def greetings(self):
+        await self.send(LINE)
+        for text in self.game.greetings_texts():
+            await self.pause()
+            await self.send(text)
+            await self.send(LINE)
+
+    async def send_fields(self):
+        await self.send(LINE)
+        await self.send(side_by_side(self.game.user_field, self.game.bot_field, "Ваша карта:", "Ваш радар:"))
+
+    #  Ручная расстановка кораблей, как в Game.input_creation. Возвращает поле или None, если для очередного
+    #  корабля не осталось свободных клеток.
+    async def manual_field(self):
+        game = self.game
+        field = BattleField(size=game.size)
+        for ship_len in game.ship_lens:
+            while True:
+                await self.send(str(field))
+                if field.used_mask == field.full_mask:
+                    await self.send("Адмирал, у вас не осталось свободных координат что бы разместить корабль.")
+                    return None
+                await self.send('Введите начальную координату и направление(0 - вверх, 1 - вниз, 2 - влево, '
+                                '3- вправо)')
+                await self.send(f'Длина корабля: {ship_len} палубы')
+                ship_point = await self.ask_point()
+                if ship_len > 1:
+                    pos = await self.ask_number("Введите направление корабля:", 0, 3)
+                else:
+                    pos = 0
+                try:
+                    field.add_ship(Ship(ship_point, ship_len, pos))
+                    break
+                except WrongShipException:
+                    await self.send("Адмирал, капитан корабля сообщает что не может выплыть в заданную позицию, "
+                                    "пожалуйста, обновите приказ с корректными данными")
+        field.preparation()
+        return field
+
+    #  Создаем поля игрока и бота.
+    async def creating_players_fields(self):
+        game = self.game
+        game.bot_field = game.random_creation()
+        choice = await self.ask_number('''Если вы желаете сами расставить корабли - введите 1,
+а если хотите что бы флот сделал это сам - введите 2:''', 1, 2)
+        user_field = None
+        while user_field is None:
+            if choice == 1:
+                user_field = await self.manual_field()
+                if user_field is None:
+                    choice = await self.ask_number("Введите 1 что бы расставить корабли заново или 2 для "
+                                                   "автоматической расстановки:", 1, 2)
+            else:
+                user_field = game.random_creation()
+        game.user_field = user_field
+        game.user = User(game.user_field, game.bot_field)
+        game.bot = Bot(game.bot_field, game.user_field)
+        game.bot_field.hid_ships = True
+
+    #  Отправляем игроку сообщения о событиях, накопившихся в игре.
+    async def send_events(self):
+        game = self.game
+        for event in game.events():
+            if isinstance(event, GameOver):
+                await self.send_fields()
+                await self.send(LINE)
+            text = game.describe_event(event)
+            if text is not None:
+                await self.send(text)
+
+    #  Игровая логика, как в Game.logic, только ввод игрока и паузы не блокируют другие сессии.
+    async def logic(self):
+        game = self.game
+        game.begin()
+        while game.winner is None:
+            await self.send_fields()
+            await self.send(LINE)
+            if game.current is game.user:
+                await self.send("Адмирал, ваш ход!")
+                while True:
+                    point = await self.ask_point()
+                    try:
+                        game.apply_shot(game.user, point)
+                        break
+                    except GameException as exc:
+                        await self.send(str(exc))
+            else:
+                await self.send("Ход противника!")
+                await self.pause()
+                game.apply_shot(game.bot, game.bot.request())
+            await self.send_events()
+
+    async def run(self):
+        await self.greetings()
+        await self.creating_players_fields()
+        await self.logic()
+
+
+#  Менеджер сессий: создает сессию для каждого подключения и следит за ограничением их количества.
+class SessionManager:
+    def __init__(self, max_sessions=1000, idle_timeout=300.0, delay=1.0, size=6, ship_lens=None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.delay = delay
+        self.size = size
+        self.ship_lens = ship_lens
+        self.sessions = set()
+
+    async def handle(self, reader, writer):
+        try:
+            if len(self.sessions) >= self.max_sessions:
+                writer.write("Все места на флоте заняты, попробуйте подключиться позже.\n".encode("utf-8"))
+                await writer.drain()
+                return
+            session = Session(reader, writer, self.size, self.idle_timeout, self.delay, self.ship_lens)
+            self.sessions.add(session)
+            try:
+                await session.run()
+            except (SessionClosed, ConnectionError):
+                pass
+            finally:
+                self.sessions.discard(session)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    #  Запускаем TCP сервер и возвращаем объект asyncio.Server.
+    async def start(self, host="127.0.0.1", port=8888):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(host, port, max_sessions, idle_timeout, delay, size, ship_lens=None):
+    manager = SessionManager(max_sessions, idle_timeout, delay, size, ship_lens)
+    server = await manager.start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер игры Морской бой.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--max-sessions", type=int, default=1000, help="максимальное количество игр одновременно")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="сколько секунд ждать ответа игрока")
+    parser.add_argument("--delay", type=float, default=1.0, help="пауза перед ходом бота, сек")
+    parser.add_argument("--size", type=int, default=6, help="размер поля")
+    parser.add_argument("--fleet", help="длины кораблей через запятую, например 4,3,3,2,2,2,1,1,1,1")
+    parser.add_argument("--preset", choices=sorted(Game.PRESETS), help="готовая настройка поля и флота")
+    args = parser.parse_args(argv)
+    size = args.size
+    ship_lens = [int(length) for length in args.fleet.split(",")] if args.fleet else None
+    if args.preset:
+        size, ship_lens = Game.PRESETS[args.preset]
+    asyncio.run(serve(args.host, args.port, args.max_sessions, args.idle_timeout, args.delay, size, ship_lens))
+
+
+if __name__ == '__main__':
+    main()
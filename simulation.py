@@ -0,0 +1,214 @@
+import argparse
+import os
+import random
+from collections import Counter
+from multiprocessing import Pool
+
+from See_Battle_upd import Bot, FleetPlacer, Game, HunterBot, priors
+from inference import MonteCarloBot
+from profiling import Profiler
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Безголовые (без печати и пауз) партии бот против бота. Нужны что бы прогонять большое количество игр
+#  и сравнивать стратегии ботов между собой.
+#  -----------------------------------------------------------------------------------------------
+
+#  Стратегии стрельбы, которые можно выбрать по имени. Значение - класс игрока с методом request.
+STRATEGIES = {}
+#  Стратегии расстановки флота. Значение - функция (size, ship_lens, rng), которая возвращает готовое поле.
+PLACEMENTS = {}
+
+
+#  Декоратор, который добавляет класс игрока в STRATEGIES под именем name.
+def register_strategy(name):
+    def register(player_class):
+        STRATEGIES[name] = player_class
+        return player_class
+    return register
+
+
+#  Декоратор, который добавляет функцию расстановки в PLACEMENTS под именем name.
+def register_placement(name):
+    def register(function):
+        PLACEMENTS[name] = function
+        return function
+    return register
+
+
+register_strategy("random")(Bot)
+register_strategy("hunter")(HunterBot)
+register_strategy("montecarlo")(MonteCarloBot)
+
+
+#  Равновероятная случайная расстановка.
+@register_placement("random")
+def random_placement(size, ship_lens, rng=random):
+    return FleetPlacer.get(size, ship_lens).create_field(rng)
+
+
+#  Расстановка "у бортов": из нескольких случайных расстановок выбирается та, где больше всего клеток кораблей
+#  лежит на краю поля. Ботам, которые чаще стреляют в центр, такой флот искать дольше.
+@register_placement("edge")
+def edge_placement(size, ship_lens, rng=random, tries=8):
+    placer = FleetPlacer.get(size, ship_lens)
+    row = (1 << size) - 1
+    border = row | (row << (size * (size - 1)))
+    for x in range(size):
+        border |= (1 << (x * size)) | (1 << (x * size + size - 1))
+    best = None
+    best_score = -1
+    for _ in range(tries):
+        chosen = placer.place(rng)
+        score = 0
+        for option in chosen:
+            score += bin(option[0] & border).count("1")
+        if score > best_score:
+            best = chosen
+            best_score = score
+    return placer.build_field(best)
+
+
+#  Сколько партий играет один процесс за одну задачу. От этого числа (а не от количества процессов) зависит
+#  разбиение на задачи, поэтому результат при одном и том же seed не зависит от workers.
+CHUNK_SIZE = 1000
+
+
+#  Функция играет одну партию без вывода на экран. Возвращает номер победителя (0 - игрок a, 1 - игрок b),
+#  количество выстрелов победителя и количество ходов (передач хода) в партии.
+def play_game(strategy_a, strategy_b, size=6, ship_lens=None, placement_a="random", placement_b="random"):
+    if ship_lens is None:
+        ship_lens = Game.PRESETS["default"][1]
+    field_a = PLACEMENTS[placement_a](size, ship_lens)
+    field_b = PLACEMENTS[placement_b](size, ship_lens)
+    players = (STRATEGIES[strategy_a](field_a, field_b), STRATEGIES[strategy_b](field_b, field_a))
+    shots = [0, 0]
+    turns = 1
+    #  Как и в Game.logic, случайно определяем кто будет ходить первым.
+    current = random.randint(0, 1)
+    while True:
+        player = players[current]
+        result = player.make_move()
+        shots[current] += 1
+        if player.radar.victory():
+            return current, shots[current], turns
+        #  При промахе ход переходит сопернику, при попадании - дополнительный ход.
+        if not result:
+            current = 1 - current
+            turns += 1
+
+
+#  Задача для одного процесса: сыграть count партий с собственным seed и вернуть частичную статистику.
+def _run_chunk(task):
+    index, count, strategy_a, strategy_b, seed, size, ship_lens, profile = task
+    #  Игра использует модуль random напрямую, поэтому задаем seed для всего процесса перед задачей.
+    random.seed(f"{seed}-{index}")
+    wins = [0, 0]
+    shots_to_win = Counter()
+    turns = Counter()
+    profiler = Profiler()
+    if profile:
+        profiler.enable()
+    try:
+        for _ in range(count):
+            winner, winner_shots, game_turns = play_game(strategy_a, strategy_b, size, ship_lens)
+            wins[winner] += 1
+            shots_to_win[winner_shots] += 1
+            turns[game_turns] += 1
+    finally:
+        profiler.disable()
+    return wins, shots_to_win, turns, profiler.snapshot() if profile else None
+
+
+#  Функция запускает n_games партий между стратегиями strategy_a и strategy_b, распределяя их по workers
+#  процессам, и возвращает общую статистику в виде словаря. Если profile = True, в статистику добавляется
+#  снимок встроенных замеров (см. profiling.py), сложенный по всем процессам.
+def simulate(n_games, strategy_a="random", strategy_b="random", seed=0, workers=1, size=6, ship_lens=None,
+             profile=False):
+    for name in (strategy_a, strategy_b):
+        if name not in STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия: {name}")
+    if ship_lens is not None:
+        ship_lens = tuple(ship_lens)
+    tasks = []
+    for index, start in enumerate(range(0, n_games, CHUNK_SIZE)):
+        count = min(CHUNK_SIZE, n_games - start)
+        tasks.append((index, count, strategy_a, strategy_b, seed, size, ship_lens, profile))
+
+    wins = [0, 0]
+    shots_to_win = Counter()
+    turns = Counter()
+    if workers > 1:
+        with Pool(workers) as pool:
+            results = list(pool.imap_unordered(_run_chunk, tasks))
+    else:
+        results = [_run_chunk(task) for task in tasks]
+    for chunk_wins, chunk_shots, chunk_turns, _ in results:
+        wins[0] += chunk_wins[0]
+        wins[1] += chunk_wins[1]
+        shots_to_win.update(chunk_shots)
+        turns.update(chunk_turns)
+
+    stats = {
+        "games": n_games,
+        "strategy_a": strategy_a,
+        "strategy_b": strategy_b,
+        "wins_a": wins[0],
+        "wins_b": wins[1],
+        "win_rate_a": wins[0] / n_games if n_games else 0.0,
+        "win_rate_b": wins[1] / n_games if n_games else 0.0,
+        "shots_to_win": dict(sorted(shots_to_win.items())),
+        "mean_shots_to_win": _mean(shots_to_win),
+        "turns": dict(sorted(turns.items())),
+        "mean_turns": _mean(turns),
+    }
+    if profile:
+        stats["profile"] = Profiler.from_snapshots(result[3] for result in results).snapshot()
+    return stats
+
+
+#  Среднее значение по распределению вида {значение: количество}.
+def _mean(distribution):
+    total = sum(distribution.values())
+    if not total:
+        return 0.0
+    return sum(value * count for value, count in distribution.items()) / total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Безголовая симуляция партий бот против бота.")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="количество партий")
+    parser.add_argument("-a", "--strategy-a", default="random", choices=sorted(STRATEGIES))
+    parser.add_argument("-b", "--strategy-b", default="random", choices=sorted(STRATEGIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="количество процессов")
+    parser.add_argument("--size", type=int, default=6, help="размер поля")
+    parser.add_argument("--fleet", help="длины кораблей через запятую, например 4,3,3,2,2,2,1,1,1,1")
+    parser.add_argument("--preset", choices=sorted(Game.PRESETS), help="готовая настройка поля и флота")
+    parser.add_argument("--profile", help="сохранить замеры горячих мест в JSON или CSV (по расширению файла)")
+    parser.add_argument("--priors", help="файл кэша априорных карт и дебютных книг ботов")
+    args = parser.parse_args(argv)
+    size = args.size
+    ship_lens = [int(length) for length in args.fleet.split(",")] if args.fleet else None
+    if args.preset:
+        size, ship_lens = Game.PRESETS[args.preset]
+    if args.priors:
+        #  Кэш готовим и сохраняем до запуска процессов, они прочитают его из файла или получат копию памяти.
+        os.environ["SEE_BATTLE_PRIORS"] = args.priors
+        priors.path = args.priors
+        priors.warm(size, ship_lens or Game.PRESETS["default"][1])
+        priors.save()
+
+    stats = simulate(args.games, args.strategy_a, args.strategy_b, args.seed, args.workers, size, ship_lens,
+                     profile=bool(args.profile))
+    print(f"Партий сыграно: {stats['games']}")
+    print(f"Победы {stats['strategy_a']} (a): {stats['wins_a']} ({stats['win_rate_a']:.1%})")
+    print(f"Победы {stats['strategy_b']} (b): {stats['wins_b']} ({stats['win_rate_b']:.1%})")
+    print(f"Среднее количество выстрелов до победы: {stats['mean_shots_to_win']:.2f}")
+    print(f"Среднее количество ходов: {stats['mean_turns']:.2f}")
+    if args.profile:
+        Profiler.from_snapshots([stats["profile"]]).export(args.profile)
+
+
+if __name__ == '__main__':
+    main()
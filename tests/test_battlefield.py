@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from See_Battle_upd import BattleField, Bot, FleetPlacer, GameException, Point, Ship
+
+FLEET = [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]
+
+
+def _state(field):
+    return (field.snapshot()[:9], str(field), "\n".join(field.render_lines(True)))
+
+
+def _shoot_all(field, rng):
+    cells = [Point(x, y) for x in range(field.size) for y in range(field.size)]
+    rng.shuffle(cells)
+    for point in cells:
+        if field.victory():
+            break
+        if not field.used_mask & field.bit(point):
+            field.shot(point)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_reverts_every_shot(seed):
+    rng = random.Random(seed)
+    field = FleetPlacer.get(10, FLEET).create_field(rng)
+    field.start_undo()
+    states = []
+    cells = [Point(x, y) for x in range(10) for y in range(10)]
+    rng.shuffle(cells)
+    for point in cells:
+        if field.victory():
+            break
+        if field.used_mask & field.bit(point):
+            continue
+        states.append(_state(field))
+        field.shot(point)
+    while states:
+        field.undo()
+        assert _state(field) == states.pop()
+    with pytest.raises(GameException):
+        field.undo()
+
+
+def test_restore_returns_to_snapshot():
+    rng = random.Random(1)
+    field = FleetPlacer.get(10, FLEET).create_field(rng)
+    before = _state(field)
+    start = field.snapshot()
+    _shoot_all(field, rng)
+    assert field.victory()
+    end = field.snapshot()
+    field.restore(start)
+    assert _state(field) == before and field.count == len(FLEET)
+    field.restore(end)
+    assert field.victory()
+
+
+def test_restore_removes_ships_added_after_snapshot():
+    field = BattleField(size=6)
+    empty = field.snapshot()
+    field.add_ship(Ship(Point(0, 0), 3, 1))
+    field.restore(empty)
+    assert field.ships == [] and field.ship_at == {} and field.used_mask == 0
+
+
+def test_restore_truncates_undo_log():
+    rng = random.Random(2)
+    field = FleetPlacer.get(10, FLEET).create_field(rng)
+    initial = _state(field)
+    field.start_undo()
+    field.shot(Point(0, 0))
+    middle = field.snapshot()
+    expected = _state(field)
+    _shoot_all(field, rng)
+    field.restore(middle)
+    assert len(field.undo_log) == 1
+    field.undo()
+    assert _state(field) == initial
+    field.restore(middle)
+    assert _state(field) == expected
+
+
+def test_restore_clears_log_that_no_longer_matches():
+    rng = random.Random(3)
+    field = FleetPlacer.get(10, FLEET).create_field(rng)
+    before = field.snapshot()
+    field.start_undo()
+    field.shot(Point(0, 0))
+    snapshot = field.snapshot()
+    field.undo()
+    field.shot(Point(5, 5))
+    field.restore(snapshot)
+    assert field.undo_log == []
+    field.restore(before)
+    assert field.undo_log == []
+
+
+def test_bot_pool_is_rebuilt_after_undo():
+    field = FleetPlacer.get(6, [3, 2, 2, 1, 1, 1, 1]).create_field(random.Random(4))
+    bot = Bot(None, field)
+    field.start_undo()
+    for _ in range(10):
+        field.shot(bot.request())
+    for _ in range(10):
+        field.undo()
+    bot.request()
+    assert len(bot._pool) == 36
@@ -0,0 +1,91 @@
+import pytest
+
+from See_Battle_upd import (BattleField, Bot, Game, GameOver, Hit, Miss, Point, PointUsedException, Ship, ShotFired,
+                            Sunk, TurnChanged, User, WrongTurnException)
+
+
+def _field(*ships):
+    field = BattleField(size=6)
+    for ship in ships:
+        field.add_ship(ship)
+    field.preparation()
+    return field
+
+
+#  Игра без консоли: у бота двухпалубный корабль в точках (0, 0)-(1, 0) и однопалубный в (4, 4),
+#  у игрока - один однопалубный в (0, 0).
+def _game(first="user"):
+    game = Game(6, [2, 1])
+    game.bot_field = _field(Ship(Point(0, 0), 2, 1), Ship(Point(4, 4), 1, 0))
+    game.user_field = _field(Ship(Point(0, 0), 1, 0))
+    game.user = User(game.user_field, game.bot_field)
+    game.bot = Bot(game.bot_field, game.user_field)
+    game.begin(game.user if first == "user" else game.bot)
+    assert list(game.events()) == [TurnChanged(game.current)]
+    return game
+
+
+def test_miss_passes_turn():
+    game = _game()
+    result = game.apply_shot(game.user, Point(5, 0))
+    assert not result
+    assert not result.extra_turn and not result.game_over and not result.sunk
+    assert list(game.events()) == [ShotFired(game.user, Point(5, 0)), Miss(game.user, Point(5, 0)),
+                                   TurnChanged(game.bot)]
+    assert game.current is game.bot
+
+
+def test_hit_and_sink_keep_turn():
+    game = _game()
+    ship = game.bot_field.ships[0]
+    result = game.apply_shot(game.user, Point(0, 0))
+    assert result and result.ship is ship
+    assert result.extra_turn and not result.sunk and not result.game_over
+    assert list(game.events()) == [ShotFired(game.user, Point(0, 0)), Hit(game.user, Point(0, 0), ship)]
+
+    result = game.apply_shot(game.user, Point(1, 0))
+    assert result.sunk and result.extra_turn and not result.game_over
+    assert list(game.events()) == [ShotFired(game.user, Point(1, 0)), Sunk(game.user, Point(1, 0), ship)]
+    assert game.current is game.user
+    assert result.events == [ShotFired(game.user, Point(1, 0)), Sunk(game.user, Point(1, 0), ship)]
+
+
+def test_last_sink_ends_game():
+    game = _game()
+    game.apply_shot(game.user, Point(0, 0))
+    game.apply_shot(game.user, Point(1, 0))
+    list(game.events())
+    last = game.bot_field.ships[1]
+    result = game.apply_shot(game.user, Point(4, 4))
+    assert result.sunk and result.game_over and not result.extra_turn
+    assert list(game.events()) == [ShotFired(game.user, Point(4, 4)), Sunk(game.user, Point(4, 4), last),
+                                   GameOver(game.user)]
+    assert game.winner is game.user
+
+
+def test_shot_out_of_turn_is_rejected():
+    game = _game(first="bot")
+    with pytest.raises(WrongTurnException):
+        game.apply_shot(game.user, Point(0, 0))
+    #  Отклоненный выстрел не меняет ни поле, ни очередь событий.
+    assert game.bot_field.shot_mask == 0
+    assert list(game.events()) == []
+
+
+def test_no_shots_after_game_over():
+    game = _game(first="bot")
+    game.apply_shot(game.bot, Point(0, 0))
+    assert game.winner is game.bot
+    for player in (game.bot, game.user):
+        with pytest.raises(WrongTurnException):
+            game.apply_shot(player, Point(3, 3))
+
+
+def test_shot_into_used_point_keeps_turn():
+    game = _game()
+    game.apply_shot(game.user, Point(0, 0))
+    list(game.events())
+    with pytest.raises(PointUsedException):
+        game.apply_shot(game.user, Point(0, 0))
+    assert game.current is game.user
+    assert list(game.events()) == []
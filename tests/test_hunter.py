@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from See_Battle_upd import FleetPlacer, Game, HunterBot, priors
+
+np = pytest.importorskip("numpy")
+
+
+#  Ход за ходом сравниваем карту через NumPy с подсчетом по маскам в тех же состояниях радара.
+@pytest.mark.parametrize("size, ship_lens", [Game.PRESETS["default"], Game.PRESETS["classic"], (12, [5, 4, 3, 1])])
+@pytest.mark.parametrize("seed", range(3))
+def test_numpy_heatmap_matches_bitmask_heatmap(monkeypatch, size, ship_lens, seed):
+    monkeypatch.setattr(priors, "enabled", False)
+    monkeypatch.setattr(HunterBot, "NUMPY_MIN_SIZE", 0)
+    random.seed(seed)
+    field = FleetPlacer.get(size, ship_lens).create_field()
+    bot = HunterBot(None, field)
+    fleet = [ship.length for ship in field.ships]
+    while not field.victory():
+        blocked = (field.shot_mask & ~field.hit_mask) | field.halo_mask | field.sunk_mask
+        wounded = field.hit_mask & ~field.sunk_mask
+        monkeypatch.setattr(HunterBot, "USE_NUMPY", True)
+        vectorized = bot.best_cells(field, fleet, blocked, wounded)
+        monkeypatch.setattr(HunterBot, "USE_NUMPY", False)
+        assert vectorized == bot.best_cells(field, fleet, blocked, wounded)
+        field.shot(bot.request())
+
+
+def test_hunter_bot_without_numpy(monkeypatch):
+    monkeypatch.setattr(priors, "enabled", False)
+    monkeypatch.setattr(HunterBot, "USE_NUMPY", False)
+    random.seed(1)
+    field = FleetPlacer.get(*Game.PRESETS["classic"]).create_field()
+    bot = HunterBot(None, field)
+    shots = 0
+    while not field.victory():
+        field.shot(bot.request())
+        shots += 1
+    assert shots < 100
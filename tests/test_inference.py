@@ -0,0 +1,58 @@
+import multiprocessing.pool
+import random
+
+import pytest
+
+import inference
+from See_Battle_upd import Bot, FleetPlacer, HunterBot, priors
+from inference import MonteCarloBot
+
+
+def _play(bot, field):
+    shots = 0
+    while not field.victory():
+        field.shot(bot.request())
+        shots += 1
+    return shots
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_montecarlo_bot_finishes_game_and_closes(workers):
+    random.seed(4)
+    field = FleetPlacer.get(6, [3, 2, 2, 1, 1, 1, 1]).create_field()
+    bot = MonteCarloBot(None, field, samples=50, workers=workers)
+    try:
+        assert _play(bot, field) <= 36
+    finally:
+        bot.close()
+    bot.close()
+
+
+def test_fallback_to_free_cell_pool_keeps_process_pool_usable(monkeypatch):
+    random.seed(1)
+    field = FleetPlacer.get(6, [3, 2, 2, 1, 1, 1, 1]).create_field()
+    #  Процессы добора не находят ни одной расстановки, а карта HunterBot пуста, поэтому каждый ход доходит
+    #  до выбора из пула свободных клеток Bot.choose_cell.
+    monkeypatch.setattr(priors, "enabled", False)
+    monkeypatch.setattr(inference, "sample_fleet", lambda *args: None)
+    monkeypatch.setattr(HunterBot, "best_cells", lambda *args: [])
+    calls = []
+    choose_cell = Bot.choose_cell
+
+    def counted(self):
+        calls.append(self)
+        return choose_cell(self)
+
+    monkeypatch.setattr(Bot, "choose_cell", counted)
+    bot = MonteCarloBot(None, field, samples=20, budget=0.01, workers=2)
+    try:
+        field.shot(bot.request())
+        pool = bot._process_pool
+        assert isinstance(pool, multiprocessing.pool.Pool)
+        field.shot(bot.request())
+        assert bot._process_pool is pool
+        assert calls == [bot, bot]
+        assert bin(field.shot_mask).count("1") == 2
+    finally:
+        bot.close()
+    assert bot._process_pool is None
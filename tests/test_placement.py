@@ -0,0 +1,70 @@
+import random
+import time
+
+import pytest
+
+from See_Battle_upd import FleetPlacementException, FleetPlacer, Game
+
+
+def _check_fleet(field, ship_lens):
+    assert sorted(ship.length for ship in field.ships) == sorted(ship_lens)
+    assert field.used_mask == 0
+    assert bin(field.ships_mask).count("1") == sum(ship_lens)
+
+
+@pytest.mark.parametrize("size, ship_lens", [
+    (6, [3, 2, 2, 1, 1, 1, 1]),
+    (10, [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]),
+    #  Почти предельные флоты: девять однопалубных - максимум для поля 6x6.
+    (6, [1] * 9),
+    (6, [2] * 6),
+    #  Большой флот из многих одинаковых кораблей.
+    Game.PRESETS["stress"],
+])
+def test_fleet_is_placed(size, ship_lens):
+    placer = FleetPlacer(size, ship_lens)
+    #  build_field ставит корабли через add_ship, который не даст кораблям пересечься или коснуться.
+    for field in placer.generate_fleets(20, seed=1):
+        _check_fleet(field, ship_lens)
+    assert placer.possible is True
+
+
+@pytest.mark.parametrize("size, ship_lens", [
+    (6, [2] * 10),
+    (6, [2] * 9),
+    (6, [1] * 10),
+    (6, [1] * 12),
+    (4, [5]),
+])
+def test_impossible_fleet_raises(size, ship_lens):
+    placer = FleetPlacer(size, ship_lens)
+    begin = time.perf_counter()
+    with pytest.raises(FleetPlacementException):
+        placer.place(random.Random(0))
+    assert time.perf_counter() - begin < 10
+
+
+def test_random_creation_reports_impossible_fleet():
+    with pytest.raises(FleetPlacementException):
+        Game(6, [1] * 10).random_creation()
+
+
+def test_generate_fleets_is_reproducible():
+    placer = FleetPlacer(6, [3, 2, 2, 1, 1, 1, 1])
+    first = [str(field) for field in placer.generate_fleets(5, seed=7)]
+    second = [str(field) for field in placer.generate_fleets(5, seed=7)]
+    assert first == second
+
+
+def test_get_ignores_fleet_order():
+    placer = FleetPlacer.get(7, [1, 2, 3, 1])
+    assert FleetPlacer.get(7, [3, 2, 1, 1]) is placer
+    assert FleetPlacer.get(7, (1, 1, 2, 3)) is placer
+
+
+def test_get_cache_is_bounded():
+    first = FleetPlacer.get(5, [2, 1])
+    for size in range(6, 6 + FleetPlacer.CACHE_SIZE):
+        FleetPlacer.get(size, [2, 1])
+    assert len(FleetPlacer._cache) <= FleetPlacer.CACHE_SIZE
+    assert FleetPlacer.get(5, [2, 1]) is not first
@@ -0,0 +1,77 @@
+import json
+import random
+
+import pytest
+
+import benchmarks
+from See_Battle_upd import FleetPlacer, HunterBot, PriorCache, priors
+
+SIZE = 6
+FLEET = [3, 2, 2, 1, 1, 1, 1]
+
+
+@pytest.mark.parametrize("content", ["{not json", "[1, 2, 3]", '{"6|3,2,2,1,1,1,1|no-touch": 7}',
+                                     '{"6|3,2,2,1,1,1,1|no-touch": {"prior": null, "openings": {"x": [1]}}}'])
+def test_corrupt_file_starts_empty_cache(tmp_path, content):
+    path = tmp_path / "priors.json"
+    path.write_text(content, encoding="utf-8")
+    cache = PriorCache(path=str(path))
+    key = cache.key(SIZE, FLEET)
+    assert cache.opening(key, 0, 0) is None
+    assert len(cache.prior(SIZE, FLEET)) == SIZE * SIZE
+
+
+def test_unreadable_path_starts_empty_cache(tmp_path):
+    #  Каталог вместо файла: open() падает с OSError.
+    cache = PriorCache(path=str(tmp_path))
+    assert cache.opening(cache.key(SIZE, FLEET), 0, 0) is None
+
+
+def test_hunter_bot_plays_with_corrupt_global_file(tmp_path, monkeypatch):
+    path = tmp_path / "priors.json"
+    path.write_text("{broken", encoding="utf-8")
+    monkeypatch.setattr(priors, "path", str(path))
+    monkeypatch.setattr(priors, "_disk", None)
+    monkeypatch.setattr(priors, "_entries", {})
+    random.seed(3)
+    field = FleetPlacer.get(SIZE, FLEET).create_field()
+    bot = HunterBot(None, field)
+    while not field.victory():
+        field.shot(bot.request())
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "priors.json")
+    cache = PriorCache(path=path)
+    cache.warm(SIZE, FLEET)
+    key = cache.key(SIZE, FLEET, HunterBot.VARIANT)
+    first = cache.opening(key, 0, 0)
+    cache.save()
+
+    loaded = PriorCache(path=path)
+    assert loaded.opening(key, 0, 0) == first
+    assert loaded.prior(SIZE, FLEET) == cache.prior(SIZE, FLEET)
+    with open(path, encoding="utf-8") as file:
+        assert key in json.load(file)
+
+
+def test_evicted_entries_are_kept_for_saving(tmp_path):
+    path = str(tmp_path / "priors.json")
+    cache = PriorCache(capacity=1, path=path)
+    cache.store_opening("a", 0, 0, [1])
+    cache.store_opening("b", 0, 0, [2])
+    assert list(cache._entries) == ["b"]
+    assert cache.opening("a", 0, 0) == [1]
+    cache.save()
+    loaded = PriorCache(path=path)
+    assert loaded.opening("a", 0, 0) == [1]
+    assert loaded.opening("b", 0, 0) == [2]
+
+
+def test_benchmark_does_not_use_or_fill_global_cache(monkeypatch):
+    monkeypatch.setattr(priors, "path", None)
+    monkeypatch.setattr(priors, "_disk", None)
+    monkeypatch.setattr(priors, "_entries", {})
+    benchmarks.run_benchmark("hunter_request", SIZE, FLEET, min_time=0.01)
+    assert priors.enabled
+    assert not priors._entries
@@ -0,0 +1,21 @@
+from See_Battle_upd import FleetPlacer
+from profiling import Profiler
+from simulation import simulate
+
+
+def test_simulation_profile_covers_fleet_placement():
+    stats = simulate(20, "random", "hunter", seed=1, profile=True)
+    profile = stats["profile"]
+    #  Каждая партия расставляет два флота.
+    assert profile["timings"]["FleetPlacer.place"]["calls"] == 40
+    assert "FleetPlacer.place.backtracks" in profile["counters"]
+    assert profile["timings"]["BattleField.shot"]["calls"] > 0
+
+
+def test_disable_restores_original_methods():
+    original = FleetPlacer.__dict__["place"]
+    with Profiler() as profiler:
+        assert FleetPlacer.__dict__["place"] is not original
+        FleetPlacer.get(6, [3, 2, 2, 1, 1, 1, 1]).place()
+    assert FleetPlacer.__dict__["place"] is original
+    assert profiler.snapshot()["timings"]["FleetPlacer.place"]["calls"] == 1
@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+import records
+from records import GameReader, GameRecord, GameRecorder, play_recorded_game
+
+
+@pytest.fixture
+def games():
+    return [play_recorded_game("random", "hunter", seed=seed) for seed in range(5)]
+
+
+def _write(path, games):
+    with GameRecorder(path) as recorder:
+        for record in games:
+            recorder.write(record)
+
+
+def _same(first, second):
+    return (first.size, first.fleets, first.shots, first.seed) == (second.size, second.fleets, second.shots,
+                                                                   second.seed)
+
+
+@pytest.mark.parametrize("size", [6, 12])
+def test_encode_decode_round_trip(size):
+    record = play_recorded_game("random", "random", size=size, seed=3)
+    assert _same(GameRecord.decode(record.encode()), record)
+
+
+def test_replay_reaches_the_recorded_end(games):
+    for record in games:
+        fields = record.replay()
+        assert fields[1 - record.winner].victory()
+        assert not fields[record.winner].victory()
+
+
+def test_reader_returns_written_games(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games[:3])
+    #  Дописываем в уже существующий файл.
+    _write(path, games[3:])
+    with GameReader(path) as reader:
+        assert len(reader) == len(games)
+        assert all(_same(read, record) for read, record in zip(reader, games))
+        assert _same(reader[4], games[4])
+
+
+def test_missing_or_stale_index_is_rebuilt(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games)
+    os.remove(path + ".idx")
+    with GameReader(path) as reader:
+        assert len(reader) == len(games)
+    #  Индекс, в котором есть смещение за концом файла.
+    with open(path + ".idx", "ab") as file:
+        file.write((10 ** 6).to_bytes(8, "little"))
+    with GameReader(path) as reader:
+        assert len(reader) == len(games)
+
+
+def test_truncated_tail_is_dropped(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games)
+    #  Обрезаем файл посередине последней записи, и отдельно - посередине ее заголовка.
+    for cut in (10, len(games[-1].encode()) - 3):
+        with open(path, "r+b") as file:
+            file.truncate(os.path.getsize(path) - cut)
+        with GameReader(path) as reader:
+            assert len(reader) == len(games) - 1
+            assert all(_same(read, record) for read, record in zip(reader, games))
+        _write(path + ".fresh", games)
+        os.replace(path + ".fresh", path)
+        os.replace(path + ".fresh.idx", path + ".idx")
+
+
+def test_append_after_deleted_index_keeps_all_games(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games[:4])
+    os.remove(path + ".idx")
+    _write(path, games[4:])
+    #  Индекс, начатый заново при дозаписи, описывает только последнюю запись и должен быть отвергнут
+    #  читателем, но и сам GameRecorder должен был его перестроить.
+    with open(path + ".idx", "rb") as file:
+        assert len(file.read()) == 8 * len(games)
+    with GameReader(path) as reader:
+        assert reader.from_index
+        assert len(reader) == len(games)
+        assert all(_same(read, record) for read, record in zip(reader, games))
+
+
+def test_reader_rejects_partial_index(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games)
+    with open(path + ".idx", "rb") as file:
+        raw = file.read()
+    #  Индекс без первых записей, индекс без последней записи и индекс с недописанным смещением.
+    for broken in (raw[8:], raw[:-8], raw + b"\x00\x01"):
+        with open(path + ".idx", "wb") as file:
+            file.write(broken)
+        with GameReader(path) as reader:
+            assert not reader.from_index
+            assert len(reader) == len(games)
+
+
+def test_append_after_truncated_tail(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    _write(path, games[:3])
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 5)
+    _write(path, games[3:])
+    with GameReader(path) as reader:
+        assert reader.from_index
+        assert reader.end == os.path.getsize(path)
+        expected = games[:2] + games[3:]
+        assert len(reader) == len(expected)
+        assert all(_same(read, record) for read, record in zip(reader, expected))
+
+
+def test_recorder_refuses_foreign_file(tmp_path, games):
+    path = str(tmp_path / "games.sbr")
+    with open(path, "wb") as file:
+        file.write(b"not a record file")
+    with pytest.raises(ValueError):
+        GameRecorder(path)
+
+
+def test_recorded_game_uses_given_fleet():
+    record = play_recorded_game("random", "random", size=8, ship_lens=[4, 3, 1], seed=2)
+    for fleet in record.fleets:
+        assert sorted(ship[2] for ship in fleet) == [1, 3, 4]
+
+
+@pytest.mark.parametrize("options, size, lengths", [
+    (["--size", "8", "--fleet", "3,2,1"], 8, [1, 2, 3]),
+    (["--preset", "classic"], 10, [1, 1, 1, 1, 2, 2, 2, 3, 3, 4]),
+])
+def test_generate_command_accepts_fleet(tmp_path, options, size, lengths):
+    path = str(tmp_path / "games.sbr")
+    records.main(["generate", path, "-n", "3"] + options)
+    with GameReader(path) as reader:
+        assert len(reader) == 3
+        for record in reader:
+            assert record.size == size
+            assert sorted(ship[2] for ship in record.fleets[0]) == lengths
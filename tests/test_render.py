@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from See_Battle_upd import FleetPlacer, Point
+
+FLEETS = {6: [3, 2, 2, 1, 1, 1, 1], 10: [4, 3, 3, 2, 2, 2, 1, 1, 1, 1], 12: [5, 4, 4, 3, 3, 2, 2, 1, 1]}
+
+
+#  Новое поле с той же расстановкой и теми же выстрелами: его строки еще ни разу не попадали в кэш.
+def _fresh(placer, placement, shots, hid_ships):
+    field = placer.build_field(placement, hid_ships=hid_ships)
+    for point in shots:
+        field.shot(point)
+    return field
+
+
+@pytest.mark.parametrize("size", sorted(FLEETS))
+@pytest.mark.parametrize("hid_ships", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_cached_rows_match_fresh_field(size, hid_ships, seed):
+    rng = random.Random(seed)
+    placer = FleetPlacer.get(size, FLEETS[size])
+    placement = placer.place(rng)
+    field = placer.build_field(placement, hid_ships=hid_ships)
+    #  Строки отрисованы заранее, что бы дальше каждый выстрел проверял сброс кэша.
+    str(field)
+    field.render_lines(not hid_ships)
+    cells = [Point(x, y) for x in range(size) for y in range(size)]
+    rng.shuffle(cells)
+    shots = []
+    halo_rows = 0
+    for point in cells:
+        if field.victory():
+            break
+        if field.used_mask & field.bit(point):
+            continue
+        halo = field.halo_mask
+        field.shot(point)
+        shots.append(point)
+        changed = field.halo_mask & ~halo
+        if changed:
+            halo_rows = max(halo_rows, len({cell // size for cell in field.mask_cells(changed)}))
+        fresh = _fresh(placer, placement, shots, hid_ships)
+        assert str(field) == str(fresh)
+        assert field.render_lines(True) == fresh.render_lines(True)
+        assert field.render_lines(False) == fresh.render_lines(False)
+    #  Хотя бы одно потопление закрасило окружность сразу в нескольких строках.
+    assert halo_rows >= 3
+
+
+def test_wide_board_header_and_rows_are_aligned():
+    field = FleetPlacer.get(10, FLEETS[10]).create_field(random.Random(0))
+    lines = field.render_lines(True)
+    assert len({len(line) for line in lines}) == 1
+    assert lines[0].split("|")[-2].strip() == "10"
+    assert lines[-1].startswith("10 |")
@@ -0,0 +1,105 @@
+import asyncio
+import random
+
+from server import SessionManager
+
+POINT_PROMPT = "Введите координаты x и y через пробел:"
+CHOICE_PROMPT = "введите 2:"
+WIN = "Поздравляем с победой"
+LOSS = "Ваш флот уничтожен"
+TIMEOUT = 10.0
+
+
+def _run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, TIMEOUT))
+
+
+async def _start(**options):
+    manager = SessionManager(delay=0, **options)
+    server = await manager.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return manager, server, port
+
+
+#  Клиент по сценарию: автоматическая расстановка и выстрелы по всем клеткам подряд. Возвращает все строки
+#  от сервера до закрытия соединения.
+async def _play(port, size=6):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    targets = iter([f"{x} {y}" for x in range(1, size + 1) for y in range(1, size + 1)])
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        text = line.decode("utf-8").rstrip("\n")
+        lines.append(text)
+        if text.endswith(CHOICE_PROMPT):
+            writer.write(b"2\n")
+        elif text == POINT_PROMPT:
+            writer.write((next(targets) + "\n").encode("utf-8"))
+    writer.close()
+    await writer.wait_closed()
+    return lines
+
+
+def test_scripted_full_game():
+    async def scenario():
+        manager, server, port = await _start()
+        async with server:
+            lines = await _play(port)
+            await asyncio.sleep(0)
+            return lines, len(manager.sessions)
+
+    random.seed(3)
+    lines, sessions = _run(scenario())
+    assert any(line.startswith(WIN) or line.startswith(LOSS) for line in lines)
+    assert "Адмирал, ваш ход!" in lines
+    assert "Ход противника!" in lines
+    assert sessions == 0
+
+
+def test_sessions_are_played_concurrently():
+    async def scenario():
+        _, server, port = await _start()
+        async with server:
+            return await asyncio.gather(*(_play(port) for _ in range(4)))
+
+    random.seed(4)
+    for lines in _run(scenario()):
+        assert any(line.startswith(WIN) or line.startswith(LOSS) for line in lines)
+
+
+def test_refuses_connections_over_max_sessions():
+    async def scenario():
+        manager, server, port = await _start(max_sessions=1)
+        async with server:
+            first_reader, first_writer = await asyncio.open_connection("127.0.0.1", port)
+            #  Первая сессия уже работает, раз прислала приветствие.
+            await first_reader.readline()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            refusal = await reader.read()
+            writer.close()
+            busy = len(manager.sessions)
+            first_writer.close()
+            await first_writer.wait_closed()
+            return refusal.decode("utf-8"), busy
+
+    refusal, busy = _run(scenario())
+    assert refusal.startswith("Все места на флоте заняты")
+    assert busy == 1
+
+
+def test_idle_session_is_closed():
+    async def scenario():
+        manager, server, port = await _start(idle_timeout=0.2)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            #  Ничего не отвечаем: сервер должен сам закрыть соединение.
+            received = await reader.read()
+            writer.close()
+            await asyncio.sleep(0)
+            return received.decode("utf-8"), len(manager.sessions)
+
+    received, sessions = _run(scenario())
+    assert "слишком долго не отдавали приказов" in received
+    assert sessions == 0
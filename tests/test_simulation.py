@@ -0,0 +1,39 @@
+import pytest
+
+import simulation
+from simulation import simulate
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    #  Несколько задач даже на малом количестве партий, что бы процессы получили разные части.
+    monkeypatch.setattr(simulation, "CHUNK_SIZE", 7)
+
+
+@pytest.mark.parametrize("strategy_a, strategy_b", [("random", "hunter"), ("hunter", "hunter")])
+def test_result_does_not_depend_on_worker_count(small_chunks, strategy_a, strategy_b):
+    single = simulate(40, strategy_a, strategy_b, seed=5, workers=1)
+    parallel = simulate(40, strategy_a, strategy_b, seed=5, workers=3)
+    assert single == parallel
+
+
+def test_same_seed_same_result_and_other_seed_differs(small_chunks):
+    first = simulate(30, "random", "random", seed=1)
+    assert simulate(30, "random", "random", seed=1) == first
+    assert simulate(30, "random", "random", seed=2) != first
+
+
+def test_stats_are_consistent(small_chunks):
+    stats = simulate(30, "random", "hunter", seed=3, workers=2)
+    assert stats["wins_a"] + stats["wins_b"] == 30
+    assert sum(stats["shots_to_win"].values()) == 30
+    assert sum(stats["turns"].values()) == 30
+    assert stats["win_rate_a"] == stats["wins_a"] / 30
+    #  Выстрелов до победы не меньше, чем клеток флота по умолчанию, и не больше клеток поля.
+    assert min(stats["shots_to_win"]) >= sum(simulation.Game.PRESETS["default"][1])
+    assert max(stats["shots_to_win"]) <= 36
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        simulate(1, "random", "nobody")
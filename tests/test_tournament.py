@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import tournament
+from tournament import Tournament, fit_ratings
+
+ENTRANTS = ["random", "hunter", "random:edge"]
+RUN_TASK = tournament._run_task
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    #  По две партии в задаче, что бы у каждой пары было несколько задач.
+    monkeypatch.setattr(tournament, "CHUNK_SIZE", 2)
+
+
+#  Обертка над _run_task, которая запоминает сыгранные задачи и может прервать турнир после stop задач.
+def _record_tasks(monkeypatch, played, stop=None):
+    def recorded(task):
+        if stop is not None and len(played) >= stop:
+            raise Interrupted()
+        played.append(task[0])
+        return RUN_TASK(task)
+
+    monkeypatch.setattr(tournament, "_run_task", recorded)
+
+
+def test_resume_plays_only_missing_tasks(tmp_path, monkeypatch, small_chunks):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    first = []
+    _record_tasks(monkeypatch, first, stop=3)
+    with pytest.raises(Interrupted):
+        Tournament(ENTRANTS, games=4, checkpoint=checkpoint).run()
+    with open(checkpoint, encoding="utf-8") as file:
+        assert sorted(json.load(file)["results"]) == sorted(first)
+
+    second = []
+    _record_tasks(monkeypatch, second)
+    resumed = Tournament(ENTRANTS, games=4, checkpoint=checkpoint)
+    resumed.run()
+    all_keys = [task[0] for task in resumed.tasks()]
+    assert len(all_keys) == 6
+    assert not set(first) & set(second)
+    assert sorted(first + second) == sorted(all_keys)
+
+    #  Продолженный турнир дает те же результаты, что и сыгранный без перерыва.
+    fresh = Tournament(ENTRANTS, games=4)
+    fresh.run()
+    assert resumed.results == fresh.results
+
+
+@pytest.mark.parametrize("change", [{"games": 6}, {"seed": 1}, {"size": 7}, {"entrants": ENTRANTS[:2]}])
+def test_checkpoint_with_other_settings_is_rejected(tmp_path, small_chunks, change):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    Tournament(ENTRANTS, games=4, checkpoint=checkpoint).run()
+    options = {"entrants": ENTRANTS, "games": 4, "seed": 0, "size": 6}
+    options.update(change)
+    with pytest.raises(ValueError):
+        Tournament(checkpoint=checkpoint, **options)
+
+
+def test_fit_ratings_order_follows_results():
+    #  0 обыгрывает 1 и 2, 1 обыгрывает 2.
+    wins = {(0, 1): [70, 30], (0, 2): [90, 10], (1, 2): [65, 35]}
+    ratings = fit_ratings(3, wins)
+    assert ratings[0] > ratings[1] > ratings[2]
+    assert sum(ratings) / 3 == pytest.approx(tournament.BASE_RATING)
+    #  Равные результаты - равные рейтинги.
+    even = fit_ratings(2, {(0, 1): [50, 50]})
+    assert even[0] == pytest.approx(even[1])
+
+
+def test_interval_is_not_empty_for_one_sided_pair():
+    match = Tournament(["hunter", "random"], games=100)
+    match.results = {"0-1-0": [100, 0]}
+    table = match.ratings()
+    assert [row["entrant"] for row in table] == ["hunter", "random"]
+    for row in table:
+        assert row["low"] < row["high"]
@@ -0,0 +1,262 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from itertools import combinations
+from multiprocessing import Pool
+
+from See_Battle_upd import Game
+from simulation import PLACEMENTS, STRATEGIES, play_game
+
+
+#  -----------------------------------------------------------------------------------------------
+#  Турнир по круговой системе между стратегиями ботов. Участник - пара "стрельба:расстановка", например
+#  "hunter:edge" (расстановку можно не указывать, тогда "random"). Каждая пара участников играет games партий,
+#  партии режутся на задачи по CHUNK_SIZE, задачи раздаются процессам начиная с самых долгих, что бы в конце
+#  не ждать одну большую задачу. Готовые задачи сохраняются в файл контрольной точки, и прерванный турнир
+#  продолжается с того места, где остановился. По итогам считается рейтинг Эло с доверительным интервалом.
+#
+#  Пример: python tournament.py random hunter hunter:edge montecarlo -n 2000 --workers 4 --checkpoint t.json
+#  -----------------------------------------------------------------------------------------------
+
+#  Сколько партий одной пары играет одна задача.
+CHUNK_SIZE = 500
+#  Примерная относительная стоимость одного хода стратегии. Нужна только для порядка раздачи задач.
+COST = {"random": 1, "hunter": 3, "montecarlo": 60}
+#  Сколько секунд может пройти между сохранениями контрольной точки.
+CHECKPOINT_INTERVAL = 5.0
+#  Средний рейтинг участников.
+BASE_RATING = 1500.0
+
+
+#  Разбираем имя участника на стратегию стрельбы и расстановки.
+def parse_entrant(name) -> tuple:
+    strategy, _, placement = name.partition(":")
+    placement = placement or "random"
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Неизвестная стратегия: {strategy}")
+    if placement not in PLACEMENTS:
+        raise ValueError(f"Неизвестная расстановка: {placement}")
+    return strategy, placement
+
+
+#  Задача для одного процесса: count партий пары участников со своим seed. Возвращает (ключ, победы a, победы b).
+def _run_task(task):
+    key, entrant_a, entrant_b, count, seed, size, ship_lens = task
+    random.seed(f"{seed}-{key}")
+    strategy_a, placement_a = parse_entrant(entrant_a)
+    strategy_b, placement_b = parse_entrant(entrant_b)
+    wins = [0, 0]
+    for _ in range(count):
+        winner, _, _ = play_game(strategy_a, strategy_b, size, ship_lens, placement_a, placement_b)
+        wins[winner] += 1
+    return key, wins[0], wins[1]
+
+
+#  Ожидаемая стоимость задачи: стоимость хода обеих стратегий, умноженная на количество клеток и партий.
+def _expected_cost(task):
+    _, entrant_a, entrant_b, count, _, size, _ = task
+    weight = COST.get(parse_entrant(entrant_a)[0], 1) + COST.get(parse_entrant(entrant_b)[0], 1)
+    return weight * size * size * count
+
+
+class Tournament:
+    def __init__(self, entrants, games=1000, size=6, ship_lens=None, seed=0, checkpoint=None):
+        if len(entrants) < 2:
+            raise ValueError("Для турнира нужно хотя бы два участника")
+        if len(set(entrants)) != len(entrants):
+            raise ValueError("Участники турнира не должны повторяться")
+        for name in entrants:
+            parse_entrant(name)
+        self.entrants = list(entrants)
+        self.games = games
+        self.size = size
+        self.ship_lens = tuple(ship_lens or Game.PRESETS["default"][1])
+        self.seed = seed
+        self.checkpoint = checkpoint
+        #  results - ключ задачи -> [победы a, победы b].
+        self.results = {}
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+
+    #  Настройки турнира. Контрольная точка от турнира с другими настройками не подходит.
+    def _settings(self) -> dict:
+        return {"entrants": self.entrants, "games": self.games, "size": self.size,
+                "ship_lens": list(self.ship_lens), "seed": self.seed, "chunk_size": CHUNK_SIZE}
+
+    def _load(self):
+        with open(self.checkpoint, encoding="utf-8") as file:
+            data = json.load(file)
+        if data["settings"] != self._settings():
+            raise ValueError(f"Контрольная точка {self.checkpoint} записана для другого турнира")
+        self.results = data["results"]
+
+    #  Сохраняем через временный файл, что бы прерывание во время записи не испортило контрольную точку.
+    def save(self):
+        if not self.checkpoint:
+            return
+        temporary = self.checkpoint + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"settings": self._settings(), "results": self.results}, file)
+        os.replace(temporary, self.checkpoint)
+
+    #  Все задачи турнира. Ключ задачи "i-j-номер" однозначно задает пару, часть партий и seed.
+    def tasks(self) -> list:
+        tasks = []
+        for i, j in combinations(range(len(self.entrants)), 2):
+            for number, start in enumerate(range(0, self.games, CHUNK_SIZE)):
+                count = min(CHUNK_SIZE, self.games - start)
+                tasks.append((f"{i}-{j}-{number}", self.entrants[i], self.entrants[j], count, self.seed,
+                              self.size, self.ship_lens))
+        return tasks
+
+    #  Играем задачи, которых еще нет в контрольной точке. Самые долгие задачи раздаются первыми.
+    def run(self, workers=1, progress=None):
+        pending = [task for task in self.tasks() if task[0] not in self.results]
+        pending.sort(key=_expected_cost, reverse=True)
+        total = len(self.tasks())
+        saved = time.monotonic()
+        pool = Pool(workers) if workers > 1 else None
+        try:
+            results = pool.imap_unordered(_run_task, pending) if pool else map(_run_task, pending)
+            for key, wins_a, wins_b in results:
+                self.results[key] = [wins_a, wins_b]
+                if progress is not None:
+                    progress(len(self.results), total)
+                if time.monotonic() - saved > CHECKPOINT_INTERVAL:
+                    self.save()
+                    saved = time.monotonic()
+        finally:
+            if pool is not None:
+                pool.terminate()
+            self.save()
+
+    #  Победы по парам: (i, j) -> [победы i, победы j].
+    def pair_wins(self) -> dict:
+        wins = {}
+        for key, (wins_a, wins_b) in self.results.items():
+            i, j, _ = key.split("-")
+            pair = wins.setdefault((int(i), int(j)), [0, 0])
+            pair[0] += wins_a
+            pair[1] += wins_b
+        return wins
+
+    #  Таблица рейтингов: список словарей по убыванию рейтинга. CI - 95% интервал по бутстрепу.
+    def ratings(self, rounds=200) -> list:
+        wins = self.pair_wins()
+        count = len(self.entrants)
+        ratings = fit_ratings(count, wins)
+        rng = random.Random(self.seed)
+        samples = [[] for _ in range(count)]
+        for _ in range(rounds):
+            for index, value in enumerate(fit_ratings(count, _resample(wins, rng))):
+                samples[index].append(value)
+        table = []
+        for index, name in enumerate(self.entrants):
+            values = sorted(samples[index])
+            low = values[int(0.025 * (rounds - 1))] if values else ratings[index]
+            high = values[int(0.975 * (rounds - 1))] if values else ratings[index]
+            games = sum(sum(value) for pair, value in wins.items() if index in pair)
+            won = sum(value[pair.index(index)] for pair, value in wins.items() if index in pair)
+            table.append({"entrant": name, "rating": ratings[index], "low": low, "high": high,
+                          "games": games, "wins": won})
+        table.sort(key=lambda row: row["rating"], reverse=True)
+        return table
+
+
+#  Рейтинги Эло по модели Брэдли-Терри: сила участника подбирается итерациями (алгоритм MM), что бы ожидаемое
+#  количество побед совпало с настоящим. К результату каждой пары добавляется по половине победы каждому,
+#  иначе у участника без поражений сила уходит в бесконечность.
+def fit_ratings(count, wins, iterations=200) -> list:
+    won = [0.0] * count
+    games = {}
+    for (i, j), (wins_i, wins_j) in wins.items():
+        won[i] += wins_i + 0.5
+        won[j] += wins_j + 0.5
+        games[i, j] = wins_i + wins_j + 1
+    strength = [1.0] * count
+    for _ in range(iterations):
+        updated = []
+        for index in range(count):
+            denominator = 0.0
+            for (i, j), played in games.items():
+                if index in (i, j):
+                    denominator += played / (strength[i] + strength[j])
+            updated.append(won[index] / denominator if denominator else strength[index])
+        #  Нормируем, что бы средняя сила (в логарифме) оставалась на месте.
+        shift = math.exp(sum(math.log(value) for value in updated) / count)
+        strength = [value / shift for value in updated]
+    return [BASE_RATING + 400 * math.log10(value) for value in strength]
+
+
+#  Случайная перевыборка результатов пар для бутстрепа. Долю побед в паре берем из бета-распределения с той же
+#  добавкой по половине победы, что и в fit_ratings, а количество побед - из биномиального распределения
+#  с этой долей. Так у пары, где один участник выиграл все партии, интервал не схлопывается в точку.
+def _resample(wins, rng) -> dict:
+    sample = {}
+    for pair, (wins_i, wins_j) in wins.items():
+        played = wins_i + wins_j
+        if not played:
+            sample[pair] = [0, 0]
+            continue
+        value = _binomial(played, rng.betavariate(wins_i + 0.5, wins_j + 0.5), rng)
+        sample[pair] = [value, played - value]
+    return sample
+
+
+#  Случайное количество успехов в count испытаниях с вероятностью share. При большой дисперсии приближаем
+#  нормальным распределением, иначе редких исходов мало и их можно отсчитать по промежуткам между ними
+#  (геометрическое распределение), не разыгрывая каждое испытание.
+def _binomial(count, share, rng) -> int:
+    rare = min(share, 1 - share)
+    if count * rare * (1 - rare) >= 25:
+        value = round(rng.gauss(count * share, math.sqrt(count * share * (1 - share))))
+        return min(max(value, 0), count)
+    hits = 0
+    if rare > 0:
+        scale = math.log(1 - rare)
+        position = 0
+        while True:
+            position += int(math.log(1.0 - rng.random()) / scale) + 1
+            if position > count:
+                break
+            hits += 1
+    return hits if rare == share else count - hits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Круговой турнир между стратегиями ботов.")
+    parser.add_argument("entrants", nargs="+",
+                        help=f"участники вида стрельба[:расстановка]; стрельба: {', '.join(sorted(STRATEGIES))}, "
+                             f"расстановка: {', '.join(sorted(PLACEMENTS))}")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="партий на каждую пару участников")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="количество процессов")
+    parser.add_argument("--size", type=int, default=6, help="размер поля")
+    parser.add_argument("--fleet", help="длины кораблей через запятую")
+    parser.add_argument("--preset", choices=sorted(Game.PRESETS), help="готовая настройка поля и флота")
+    parser.add_argument("--checkpoint", help="файл контрольной точки для продолжения прерванного турнира")
+    parser.add_argument("--save", help="сохранить таблицу рейтингов в JSON")
+    args = parser.parse_args(argv)
+    size = args.size
+    ship_lens = [int(length) for length in args.fleet.split(",")] if args.fleet else None
+    if args.preset:
+        size, ship_lens = Game.PRESETS[args.preset]
+
+    tournament = Tournament(args.entrants, args.games, size, ship_lens, args.seed, args.checkpoint)
+    tournament.run(args.workers, lambda done, total: print(f"\rЗадач сыграно: {done}/{total}", end="", flush=True))
+    print()
+    table = tournament.ratings()
+    print(f"{'участник':<24}{'рейтинг':>10}{'95% интервал':>20}{'партий':>10}{'побед':>10}")
+    for row in table:
+        interval = f"{row['low']:.0f}..{row['high']:.0f}"
+        print(f"{row['entrant']:<24}{row['rating']:>10.0f}{interval:>20}{row['games']:>10}{row['wins']:>10}")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(table, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()